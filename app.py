@@ -1,13 +1,16 @@
 import os
 from app import create_app
 
-# Crear aplicación
-app = create_app()
-
 if __name__ == '__main__':
+    # Crear aplicación solo al ejecutar el script: los procesos del pool de
+    # reconstrucción (forkserver/spawn) reimportan este módulo al arrancar
+    # y no deben crear otra aplicación. gunicorn y `flask --app app` usan
+    # directamente la fábrica create_app()
+    app = create_app()
+
     # Configuración para producción
     port = int(os.environ.get('PORT', 5000))
-    debug = os.environ.get('FLASK_ENV') != 'production'
+    debug = app.config['DEBUG']
 
     print("Iniciando DevBlog...")
     print(f"Puerto: {port}")
@@ -1,11 +1,24 @@
+import os
+import click
 from flask import Flask, render_template
-from config import Config
+from jinja2 import FileSystemBytecodeCache
+from config import config, basedir
 
-def create_app():
-    # Crear la instancia de Flask
-    app = Flask(__name__)
-    # Cargar configuración desde config.py
-    app.config.from_object(Config)
+def create_app(config_name=None):
+    # Crear la instancia de Flask (los estáticos están en static/ de la raíz
+    # del proyecto, no dentro del paquete app/)
+    app = Flask(__name__, static_folder=os.path.join(basedir, 'static'))
+    # Cargar el perfil de configuración (development / testing / production)
+    config_name = config_name or os.environ.get('FLASK_ENV', 'default')
+    app.config.from_object(config.get(config_name, config['default']))
+    # Caché de bytecode de plantillas: evita recompilarlas en cada arranque
+    cache_dir = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    # Aplicar la configuración al almacenamiento de posts
+    from app.models import blog_storage
+    blog_storage.configure(app.config)
     # Registrar las rutas (blueprints en aplicaciones más grandes)
     from app.routes import main
     app.register_blueprint(main)
@@ -23,4 +36,18 @@ def create_app():
         Maneja errores 500 (error interno del servidor)
         """
         return render_template('500.html'), 500
-    return app
\ No newline at end of file
+
+    @app.cli.command('compile-templates')
+    def compile_templates():
+        """
+        Compila todas las plantillas para llenar la caché de bytecode
+        (se ejecuta al construir la imagen Docker)
+        """
+        if app.jinja_env.bytecode_cache is None:
+            click.echo('Sin JINJA_BYTECODE_CACHE_DIR no hay caché que llenar (usa FLASK_ENV=production)')
+            return
+        names = app.jinja_env.list_templates()
+        for name in names:
+            app.jinja_env.get_template(name)
+        click.echo(f'{len(names)} plantillas compiladas')
+    return app
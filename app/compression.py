@@ -0,0 +1,52 @@
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+# Nivel de zlib: 6 es el equilibrio habitual entre tamaño y velocidad
+COMPRESSION_LEVEL = 6
+
+
+def compress_text(text: str) -> bytes:
+    """Comprime un texto con zlib"""
+    return zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decompress_text(data: bytes) -> str:
+    """Descomprime un texto guardado con compress_text"""
+    return zlib.decompress(data).decode('utf-8')
+
+
+class LRUCache:
+    """
+    Caché acotada que descarta el elemento usado hace más tiempo
+    Segura para usarla desde varios hilos
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, loader: Callable):
+        """
+        Devuelve el valor de `key`; si no está lo calcula con loader() y lo guarda
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        value = loader()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
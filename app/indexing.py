@@ -0,0 +1,148 @@
+import heapq
+import math
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from app.compression import decompress_text
+from app.rendering import RenderedContent, render_content
+from app.search import TITLE_TERM_WEIGHT, vocabulary
+
+# Por debajo de este número de posts la reconstrucción se hace en serie:
+# arrancar procesos y enviarles los datos cuesta más de lo que se gana
+PARALLEL_REBUILD_MIN_POSTS = 10000
+# Lotes por proceso: varios lotes pequeños reparten mejor la carga que uno grande
+SHARDS_PER_WORKER = 4
+# Lotes enviados a la vez por proceso: el resto espera sin serializarse,
+# así no se copia todo el corpus en las colas del pool de golpe
+MAX_PENDING_PER_WORKER = 2
+
+# Datos de un post que necesita la reconstrucción:
+# (id, título, contenido o bytes comprimidos, autor, fecha de creación, markdown)
+PostRow = Tuple[int, str, Union[str, bytes], str, datetime, bool]
+DateKey = Tuple[datetime, int]
+
+
+class IndexData(NamedTuple):
+    """Estructuras derivadas de un conjunto de posts, listas para fusionar o instalar"""
+    by_date: List[DateKey]
+    by_author: Dict[str, List[DateKey]]
+    postings: Dict[str, Set[int]]
+    weights: Dict[str, int]
+    display: Dict[str, str]
+    rendered: Dict[int, RenderedContent]
+
+
+def build_shard(rows: Sequence[PostRow]) -> IndexData:
+    """
+    Calcula índices, vocabulario y resúmenes de un lote de posts
+    Se ejecuta en un proceso aparte, así que solo usa funciones puras
+    """
+    by_date: List[DateKey] = []
+    by_author: Dict[str, List[DateKey]] = {}
+    postings: Dict[str, Set[int]] = {}
+    weights: Dict[str, int] = {}
+    display: Dict[str, str] = {}
+    rendered: Dict[int, RenderedContent] = {}
+
+    for post_id, title, body, author, created_at, markdown in rows:
+        content = decompress_text(body) if isinstance(body, bytes) else body
+        key = (created_at, -post_id)
+        by_date.append(key)
+        by_author.setdefault(author, []).append(key)
+
+        title_terms = vocabulary(title)
+        content_terms = vocabulary(content)
+        for terms, weight in ((title_terms, TITLE_TERM_WEIGHT), (content_terms, 1)):
+            for term, surface in terms.items():
+                current = weights.get(term)
+                if current is None:
+                    weights[term] = weight
+                    display[term] = surface
+                else:
+                    weights[term] = current + weight
+        for term in title_terms.keys() | content_terms.keys():
+            posting = postings.get(term)
+            if posting is None:
+                postings[term] = {post_id}
+            else:
+                posting.add(post_id)
+
+        # El HTML se genera al mostrar el post: aquí solo estadísticas y resumen
+        rendered[post_id] = render_content(content, markdown, with_html=False)
+
+    by_date.sort()
+    for keys in by_author.values():
+        keys.sort()
+    return IndexData(by_date, by_author, postings, weights, display, rendered)
+
+
+def merge_into(merged: IndexData, shard: IndexData) -> IndexData:
+    """
+    Añade un lote a lo ya fusionado: las listas ordenadas se mezclan con
+    heapq.merge y los diccionarios de `merged` se amplían en el sitio.
+    Fusionar cada lote al llegar evita tener todos los parciales en memoria
+    """
+    for author, keys in shard.by_author.items():
+        current = merged.by_author.get(author)
+        merged.by_author[author] = list(heapq.merge(current, keys)) if current else keys
+    postings = merged.postings
+    for term, posts in shard.postings.items():
+        if term in postings:
+            postings[term] |= posts
+        else:
+            postings[term] = posts
+    weights = merged.weights
+    for term, weight in shard.weights.items():
+        weights[term] = weights.get(term, 0) + weight
+    display = merged.display
+    for term, surface in shard.display.items():
+        display.setdefault(term, surface)
+    merged.rendered.update(shard.rendered)
+    return merged._replace(by_date=list(heapq.merge(merged.by_date, shard.by_date)))
+
+
+def build_indexes(rows: Sequence[PostRow], workers: int = 1,
+                  min_parallel: int = PARALLEL_REBUILD_MIN_POSTS) -> IndexData:
+    """
+    Construye todas las estructuras derivadas de los posts
+
+    Con workers > 1 y suficientes posts reparte el corpus en lotes entre un
+    pool de procesos y fusiona los resultados; si no, lo hace en serie.
+    Los lotes se envían a medida que hay hueco (como mucho
+    MAX_PENDING_PER_WORKER por proceso) y los procesos se crean con
+    forkserver/spawn: no heredan los hilos ni los locks del servidor.
+    """
+    if workers <= 1 or len(rows) < min_parallel:
+        return build_shard(rows)
+
+    shard_size = math.ceil(len(rows) / (workers * SHARDS_PER_WORKER))
+    starts = range(0, len(rows), shard_size)
+    shards = iter(enumerate(starts))
+    pending: Dict[Future, int] = {}
+    ready: Dict[int, IndexData] = {}  # Lotes terminados antes que alguno anterior
+    merged: Optional[IndexData] = None
+    next_number = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        while True:
+            for number, start in islice(shards, workers * MAX_PENDING_PER_WORKER - len(pending)):
+                pending[pool.submit(build_shard, rows[start:start + shard_size])] = number
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                ready[pending.pop(future)] = future.result()
+            # Se fusiona en el orden de los posts: el resultado es igual al de la versión en serie
+            while next_number in ready:
+                shard = ready.pop(next_number)
+                merged = shard if merged is None else merge_into(merged, shard)
+                next_number += 1
+    return merged
+
+
+def _pool_context():
+    """forkserver donde existe (POSIX); si no, spawn"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# Valores por defecto del escritor en segundo plano
+MAX_BATCH = 256  # Cambios por grupo de escritura (un solo fsync por grupo)
+MAX_DELAY = 0.05  # Segundos que se espera a que lleguen más cambios al grupo
+QUEUE_SIZE = 10000  # Cambios pendientes antes de frenar a quien escribe
+
+_STOP = object()  # Marca para que el hilo escritor termine
+
+
+def read_log(path: str) -> Iterator[Dict]:
+    """
+    Lee los cambios guardados en el log (uno por línea en JSON)
+    Las líneas ilegibles (p. ej. la última a medio escribir tras una caída)
+    se saltan con un aviso: las que vienen detrás se siguen leyendo
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as log:
+        for number, line in enumerate(log, start=1):
+            try:
+                yield json.loads(line)
+            except ValueError:  # JSONDecodeError y UnicodeDecodeError
+                logger.warning('Línea %d ilegible en %s, se ignora', number, path)
+
+
+def truncate_partial_line(path: str):
+    """
+    Corta el log tras el último salto de línea completo
+
+    Una caída a mitad de escritura deja un fragmento sin '\\n' al final; si
+    no se quita, el siguiente grupo se escribiría pegado a él y esa línea
+    (con el primer cambio del grupo) no se podría leer.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as log:
+        end = log.seek(0, os.SEEK_END)
+        keep = 0
+        position = end
+        while position > 0:
+            step = min(4096, position)
+            log.seek(position - step)
+            newline = log.read(step).rfind(b'\n')
+            if newline != -1:
+                keep = position - step + newline + 1
+                break
+            position -= step
+        if keep < end:
+            logger.warning('Se descartan %d bytes incompletos al final de %s', end - keep, path)
+            log.truncate(keep)
+
+
+class WriteBehindLog:
+    """
+    Log de cambios en disco escrito por un hilo en segundo plano
+
+    Quien escribe solo encola el cambio. El hilo agrupa los cambios que
+    llegan en `max_delay` segundos (hasta `max_batch`) y los escribe con un
+    único fsync (group commit). Si la cola se llena, append() bloquea hasta
+    que haya sitio, frenando a los escritores en vez de crecer sin límite.
+    """
+
+    def __init__(self, path: str, max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY,
+                 queue_size: int = QUEUE_SIZE):
+        self.path = path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        truncate_partial_line(path)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='devblog-write-behind', daemon=True)
+        self._thread.start()
+
+    def append(self, record: Dict):
+        """Encola un cambio para escribirlo (bloquea si la cola está llena)"""
+        self._queue.put(record)
+
+    def flush(self):
+        """Espera a que todos los cambios encolados estén escritos en disco"""
+        self._queue.join()
+
+    def close(self):
+        """Escribe lo pendiente y detiene el hilo"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._file.close()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch and batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is _STOP
+            records = [record for record in batch if record is not _STOP]
+            try:
+                self._write(records)
+            except OSError:
+                logger.exception('No se pudieron guardar %d cambios en %s', len(records), self.path)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, records: List[Dict]):
+        """Escribe un grupo de cambios con un solo fsync"""
+        if not records:
+            return
+        self._file.write(''.join(json.dumps(record) + '\n' for record in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
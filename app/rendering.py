@@ -0,0 +1,100 @@
+import html
+import math
+import re
+from typing import NamedTuple
+
+from markupsafe import Markup, escape
+
+try:
+    import markdown
+except ImportError:  # Markdown es opcional: sin él se usan párrafos simples
+    markdown = None
+
+# Velocidad de lectura usada para estimar el tiempo (igual que en script.js)
+WORDS_PER_MINUTE = 200
+# Longitud máxima del resumen que se muestra en los listados
+SUMMARY_LENGTH = 150
+# Esquemas permitidos en enlaces e imágenes de Markdown (las URLs relativas
+# y los anclajes #... también se permiten)
+SAFE_URL_SCHEMES = ('http', 'https', 'mailto')
+_URL_SCHEME = re.compile(r'([a-z][a-z0-9+.\-]*):', re.IGNORECASE)
+
+
+class RenderedContent(NamedTuple):
+    """Contenido de un post ya procesado para mostrarlo en las plantillas"""
+    html: Markup
+    word_count: int
+    char_count: int
+    reading_time: int
+    summary: str
+
+
+def render_paragraphs(content: str) -> Markup:
+    """
+    Convierte bloques separados por línea en blanco en <p> y los saltos de línea en <br>
+    El texto se escapa, así que el contenido de los usuarios no puede inyectar HTML
+    """
+    paragraphs = (p.strip() for p in content.split('\n\n'))
+    return Markup('\n').join(
+        Markup('<p>{}</p>').format(Markup('<br>').join(escape(line) for line in p.split('\n')))
+        for p in paragraphs if p
+    )
+
+
+def is_safe_url(url: str) -> bool:
+    """
+    Indica si una URL es relativa o usa uno de SAFE_URL_SCHEMES
+    Se mira como la lee el navegador: con las entidades decodificadas y sin
+    espacios ni caracteres de control (`java&#115;cript:` es javascript:)
+    """
+    url = ''.join(char for char in html.unescape(url) if char > ' ' and char != '\x7f')
+    match = _URL_SCHEME.match(url)
+    return match is None or match.group(1).lower() in SAFE_URL_SCHEMES
+
+
+if markdown is not None:
+    class SafeUrlTreeprocessor(markdown.treeprocessors.Treeprocessor):
+        """Quita los href/src de Markdown con esquemas no permitidos (javascript:, data:...)"""
+
+        def run(self, root):
+            for element in root.iter():
+                for attribute in ('href', 'src'):
+                    url = element.get(attribute)
+                    # Markdown guarda los '&' como un marcador hasta serializar
+                    if url is not None and not is_safe_url(url.replace(markdown.util.AMP_SUBSTITUTE, '&')):
+                        del element.attrib[attribute]
+
+
+def render_markdown(content: str) -> Markup:
+    """
+    Convierte Markdown a HTML desactivando el HTML embebido en el texto
+    Los enlaces e imágenes solo conservan URLs seguras (ver is_safe_url)
+    """
+    md = markdown.Markdown()
+    md.preprocessors.deregister('html_block')
+    md.inlinePatterns.deregister('html')
+    # Después de 'unescape' (prioridad 0): las URLs ya tienen su texto final
+    md.treeprocessors.register(SafeUrlTreeprocessor(md), 'safe_urls', -10)
+    return Markup(md.convert(content))
+
+
+def render_content(content: str, use_markdown: bool = False,
+                   with_html: bool = True) -> RenderedContent:
+    """
+    Procesa el contenido de un post una sola vez: HTML, estadísticas y resumen
+    Con with_html=False solo calcula estadísticas y resumen (html queda en None)
+    """
+    if not with_html:
+        html = None
+    elif use_markdown and markdown is not None:
+        html = render_markdown(content)
+    else:
+        html = render_paragraphs(content)
+    word_count = len(content.split())
+    return RenderedContent(
+        html=html,
+        word_count=word_count,
+        char_count=len(content),
+        reading_time=max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+        summary=content[:SUMMARY_LENGTH] + '...' if len(content) > SUMMARY_LENGTH else content
+    )
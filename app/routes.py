@@ -1,19 +1,79 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
-from app.models import blog_storage, BlogPost
-from datetime import datetime
+import json
+from flask import Blueprint, Response, render_template, request, jsonify, redirect, url_for, flash
+from app.models import blog_storage, BlogPost, VersionConflictError
+from datetime import datetime, timedelta
 
 # Crear un Blueprint para organizar las rutas
 main = Blueprint('main', __name__)
 
+# Tiempo máximo (segundos) que una petición long-poll puede quedar esperando
+MAX_LONG_POLL_WAIT = 30
+# Máximo de sugerencias que devuelve /api/suggest
+MAX_SUGGESTIONS = 20
+# Cada cuánto se manda un comentario keep-alive en el stream SSE
+SSE_HEARTBEAT = 15
+
+
+def _parse_date_arg(name: str, end_of_day: bool = False):
+    """
+    Lee un parámetro de fecha ISO (YYYY-MM-DD o YYYY-MM-DDTHH:MM:SS)
+    Con solo fecha y end_of_day=True se toma el final de ese día
+    Lanza ValueError si el formato no es válido
+    """
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        # Las fechas de los posts son hora local sin zona: se compara en hora local
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1, microseconds=-1)
+    return parsed
+
+
+def _get_filtered_posts():
+    """
+    Devuelve los posts según los filtros ?author=, ?since= y ?until=
+    Lanza ValueError si alguna fecha es inválida
+    """
+    author = request.args.get('author', '').strip() or None
+    since = _parse_date_arg('since')
+    until = _parse_date_arg('until', end_of_day=True)
+    if author is None and since is None and until is None:
+        return blog_storage.get_all_posts()
+    return blog_storage.filter_posts(author=author, since=since, until=until)
+
+
+@main.app_context_processor
+def inject_stats():
+    """Agregados del blog disponibles en todas las plantillas como `stats` (O(1))"""
+    return {'stats': blog_storage.stats()}
+
+
+def _fuzzy_requested() -> bool:
+    """Indica si la petición pide búsqueda aproximada (?fuzzy=1)"""
+    return request.args.get('fuzzy', '').lower() in ('1', 'true', 'on')
+
+
 # ================================
 # RUTAS PARA PÁGINAS WEB (HTML)
 # ================================
 
 @main.route('/')
 def index():
-    """Página principal - Lista todos los posts del blog"""
-    posts = blog_storage.get_all_posts()
-    return render_template('index.html', posts=posts, title='DevBlog - Mi Blog Personal')
+    """Página principal - Lista los posts del blog (filtrables por autor y fecha)"""
+    try:
+        posts = _get_filtered_posts()
+    except ValueError:
+        flash('Formato de fecha inválido, usa YYYY-MM-DD', 'error')
+        posts = blog_storage.get_all_posts()
+    return render_template(
+        'index.html',
+        posts=posts,
+        author=request.args.get('author', '').strip(),
+        title='DevBlog - Mi Blog Personal'
+    )
 
 
 @main.route('/post/<int:post_id>')
@@ -69,10 +129,11 @@ def create_post():
 
 @main.route('/search')
 def search():
-    """Búsqueda de posts"""
+    """Búsqueda de posts (?fuzzy=1 tolera errores de escritura)"""
     query = request.args.get('q', '').strip()
+    fuzzy = _fuzzy_requested()
     if query:
-        results = blog_storage.search_posts(query)
+        results = blog_storage.search_posts(query, fuzzy=fuzzy)
         message = (
             f'Resultados para: "{query}"'
             if results else f'No se encontraron resultados para: "{query}"'
@@ -85,6 +146,7 @@ def search():
         'search.html',
         posts=results,
         query=query,
+        fuzzy=fuzzy,
         message=message,
         title=f'Búsqueda: {query}' if query else 'Búsqueda - DevBlog'
     )
@@ -96,8 +158,14 @@ def search():
 
 @main.route('/api/posts', methods=['GET'])
 def api_get_posts():
-    """API: Obtener todos los posts en formato JSON"""
-    posts = blog_storage.get_all_posts()
+    """API: Obtener todos los posts en formato JSON (?author=, ?since=, ?until=)"""
+    try:
+        posts = _get_filtered_posts()
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Formato de fecha inválido, usa YYYY-MM-DD'
+        }), 400
     return jsonify({
         'success': True,
         'data': [post.to_dict() for post in posts],
@@ -155,18 +223,66 @@ def api_create_post():
         }), 500
 
 
+def _post_etag(post: BlogPost) -> str:
+    """ETag de una versión concreta de un post"""
+    return f'{post.id}-{post.version}'
+
+
+def _expected_version(post_id: int):
+    """
+    Versión que exige la cabecera If-Match (None si no hay precondición)
+    Devuelve 0, que nunca coincide, si ningún ETag corresponde a este post
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    for etag in if_match.as_set():
+        prefix, _, version = etag.partition('-')
+        if prefix == str(post_id) and version.isdigit():
+            return int(version)
+    return 0
+
+
+def _validate_update(data: dict, partial: bool) -> list:
+    """
+    Valida los campos editables de un PUT/PATCH y devuelve la lista de errores
+    En PATCH (merge patch) un null significaría borrar el campo, y son obligatorios.
+    Sin título ni contenido no hay nada que cambiar: se rechaza en vez de
+    subir la versión (invalidaría los ETag de otros editores sin motivo)
+    """
+    errors = []
+    for field, label in (('title', 'título'), ('content', 'contenido')):
+        if field not in data or (data[field] is None and not partial):
+            continue
+        value = data[field]
+        if not isinstance(value, str) or not value.strip():
+            errors.append(f'El {label} no puede estar vacío')
+    if isinstance(data.get('title'), str) and len(data['title'].strip()) > 200:
+        errors.append('El título no puede tener más de 200 caracteres')
+    if not errors and data.get('title') is None and data.get('content') is None:
+        errors.append('Se debe enviar el título o el contenido')
+    return errors
+
+
 @main.route('/api/posts/<int:post_id>', methods=['GET'])
 def api_get_post(post_id):
-    """API: Obtener un post específico por ID"""
+    """API: Obtener un post específico por ID (con ETag; If-None-Match responde 304)"""
     post = blog_storage.get_post_by_id(post_id)
     if not post:
         return jsonify({'success': False, 'error': 'Post no encontrado'}), 404
-    return jsonify({'success': True, 'data': post.to_dict()})
+    response = jsonify({'success': True, 'data': post.to_dict()})
+    response.set_etag(_post_etag(post))
+    return response.make_conditional(request)
 
 
-@main.route('/api/posts/<int:post_id>', methods=['PUT'])
+@main.route('/api/posts/<int:post_id>', methods=['PUT', 'PATCH'])
 def api_update_post(post_id):
-    """API: Actualizar un post existente"""
+    """
+    API: Actualizar un post existente
+    PATCH aplica un JSON merge patch con los campos enviados. If-Match con el
+    ETag del post evita pisar ediciones ajenas (412), y Prefer: return=minimal
+    responde 204 sin cuerpo
+    """
     try:
         if not request.is_json:
             return jsonify({
@@ -174,26 +290,46 @@ def api_update_post(post_id):
                 'error': 'Content-Type debe ser application/json'
             }), 400
 
-        data = request.get_json()
-        if not data:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data, dict):
             return jsonify({
                 'success': False,
                 'error': 'No se proporcionaron datos JSON válidos'
             }), 400
 
-        updated_post = blog_storage.update_post(
-            post_id,
-            title=data.get('title'),
-            content=data.get('content')
-        )
+        errors = _validate_update(data, partial=request.method == 'PATCH')
+        if errors:
+            return jsonify({'success': False, 'error': '; '.join(errors)}), 400
+
+        try:
+            updated_post = blog_storage.update_post(
+                post_id,
+                title=data.get('title'),
+                content=data.get('content'),
+                expected_version=_expected_version(post_id)
+            )
+        except VersionConflictError as conflict:
+            response = jsonify({
+                'success': False,
+                'error': 'El post fue modificado por otra petición',
+                'data': conflict.post.to_dict()
+            })
+            response.set_etag(_post_etag(conflict.post))
+            return response, 412
         if not updated_post:
             return jsonify({'success': False, 'error': 'Post no encontrado'}), 404
 
-        return jsonify({
-            'success': True,
-            'data': updated_post.to_dict(),
-            'message': 'Post actualizado exitosamente'
-        })
+        if 'return=minimal' in request.headers.get('Prefer', ''):
+            response = Response(status=204)
+            response.headers['Preference-Applied'] = 'return=minimal'
+        else:
+            response = jsonify({
+                'success': True,
+                'data': updated_post.to_dict(),
+                'message': 'Post actualizado exitosamente'
+            })
+        response.set_etag(_post_etag(updated_post))
+        return response
 
     except Exception as e:
         return jsonify({'success': False, 'error': f'Error interno: {str(e)}'}), 500
@@ -211,7 +347,7 @@ def api_delete_post(post_id):
 
 @main.route('/api/search', methods=['GET'])
 def api_search_posts():
-    """API: Buscar posts - Parámetro ?q=término_de_búsqueda"""
+    """API: Buscar posts - Parámetro ?q=término_de_búsqueda (?fuzzy=1 tolera errores)"""
     query = request.args.get('q', '').strip()
     if not query:
         return jsonify({
@@ -219,15 +355,92 @@ def api_search_posts():
             'error': 'Parámetro de búsqueda "q" es requerido'
         }), 400
 
-    results = blog_storage.search_posts(query)
+    fuzzy = _fuzzy_requested()
+    results = blog_storage.search_posts(query, fuzzy=fuzzy)
     return jsonify({
         'success': True,
         'data': [post.to_dict() for post in results],
         'query': query,
+        'fuzzy': fuzzy,
         'count': len(results)
     })
-@main.route('/api/health')
 
+
+@main.route('/api/suggest', methods=['GET'])
+def api_suggest():
+    """API: Sugerencias de búsqueda mientras se escribe - Parámetro ?q=prefijo"""
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 8, type=int), MAX_SUGGESTIONS)
+    suggestions = blog_storage.suggest(query, limit) if query else []
+    return jsonify({
+        'success': True,
+        'data': suggestions,
+        'query': query,
+        'count': len(suggestions)
+    })
+
+
+@main.route('/api/stats', methods=['GET'])
+def api_stats():
+    """API: Estadísticas del blog (posts, palabras, posts por autor y por día)"""
+    return jsonify({
+        'success': True,
+        'data': blog_storage.stats()
+    })
+
+
+@main.route('/api/changes', methods=['GET'])
+def api_get_changes():
+    """
+    API: Cambios incrementales - Parámetro ?since=<seq>
+    ?wait=<segundos> activa long-poll; ?stream=1 o Accept: text/event-stream usa SSE
+    """
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Los parámetros "since" y "wait" deben ser numéricos'
+        }), 400
+    since = max(since, 0)
+    wait = min(max(wait, 0), MAX_LONG_POLL_WAIT)
+
+    if request.args.get('stream') or request.accept_mimetypes.best == 'text/event-stream':
+        return Response(
+            _change_stream(since),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    if wait:
+        changes, last_seq, reset = blog_storage.wait_for_changes(since, wait)
+    else:
+        changes, last_seq, reset = blog_storage.get_changes(since)
+    return jsonify({
+        'success': True,
+        'data': changes,
+        'last_seq': last_seq,
+        'reset': reset,
+        'count': len(changes)
+    })
+
+
+def _change_stream(since: int):
+    """Genera eventos SSE con cada cambio posterior a `since`"""
+    while True:
+        changes, last_seq, reset = blog_storage.wait_for_changes(since, SSE_HEARTBEAT)
+        if reset:
+            # El cliente se quedó atrás: debe recargar todos los posts
+            yield f'id: {last_seq}\nevent: reset\ndata: {{}}\n\n'
+        elif not changes:
+            yield ': keep-alive\n\n'
+        for change in changes:
+            yield f'id: {change["seq"]}\nevent: change\ndata: {json.dumps(change)}\n\n'
+        since = last_seq
+
+
+@main.route('/api/health')
 def api_health():
     """API: Health check endpoint"""
     return jsonify({
@@ -0,0 +1,355 @@
+import heapq
+import re
+import string
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Las palabras de una sola letra no aportan como sugerencia
+MIN_TERM_LENGTH = 2
+# Máximo de términos que se revisan por prefijo (acota el coste de prefijos muy cortos)
+MAX_PREFIX_SCAN = 2000
+# Peso de un término de título frente a uno del contenido en las sugerencias
+TITLE_TERM_WEIGHT = 3
+# Máximo de términos candidatos a los que se calcula la distancia de edición
+FUZZY_SHORTLIST = 50
+
+# Caracteres con los que se generan las variantes por sustitución o inserción
+# de las palabras cortas (los términos ya están normalizados: sin acentos)
+EDIT_ALPHABET = string.ascii_lowercase + string.digits
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """
+    Pasa a minúsculas y elimina acentos: 'Contenedores Ágiles' -> 'contenedores agiles'
+    """
+    if text.isascii():
+        return text.lower()  # Sin acentos que quitar: evita la descomposición Unicode
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def vocabulary(text: str) -> Dict[str, str]:
+    """
+    Términos distintos de un texto: {término normalizado: forma original en minúsculas}
+    """
+    terms = {}
+    for word in _WORD_RE.findall(text.lower()):
+        term = normalize(word)
+        if len(term) >= MIN_TERM_LENGTH:
+            terms.setdefault(term, word)
+    return terms
+
+
+def query_words(query: str) -> List[str]:
+    """
+    Palabras normalizadas de una búsqueda, sin descartar las de una letra
+    (a diferencia de vocabulary(), que decide qué se indexa)
+    """
+    return list(dict.fromkeys(normalize(word) for word in _WORD_RE.findall(query.lower())))
+
+
+class PrefixIndex:
+    """
+    Vocabulario ordenado con un peso por término para autocompletar
+
+    Los términos se guardan en una lista ordenada: todos los que empiezan por
+    un prefijo forman un rango contiguo que se localiza con bisect.
+    """
+
+    def __init__(self):
+        self._terms: List[str] = []
+        self._weights: Dict[str, int] = {}
+        # Forma con acentos que se muestra al usuario ('integracion' -> 'integración')
+        self._display: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @classmethod
+    def from_weights(cls, weights: Dict[str, int], display: Dict[str, str]) -> 'PrefixIndex':
+        """Construye el índice de una vez (una sola ordenación en vez de insertar uno a uno)"""
+        index = cls()
+        index._terms = sorted(weights)
+        index._weights = dict(weights)
+        index._display = {term: display[term] for term in index._terms}
+        return index
+
+    def copy(self) -> 'PrefixIndex':
+        """
+        Copia independiente (para copy-on-write en BlogStorage): O(términos)
+        en referencias, los pesos y las formas son inmutables
+        """
+        clone = PrefixIndex()
+        clone._terms = list(self._terms)
+        clone._weights = dict(self._weights)
+        clone._display = dict(self._display)
+        return clone
+
+    def add(self, terms: Dict[str, str], weight: int = 1):
+        """
+        Suma `weight` a cada término (los nuevos se insertan en orden)
+        `terms` es el resultado de vocabulary()
+        """
+        for term, display in terms.items():
+            if term in self._weights:
+                self._weights[term] += weight
+            else:
+                self._weights[term] = weight
+                self._display[term] = display
+                insort(self._terms, term)
+
+    def remove(self, terms: Iterable[str], weight: int = 1):
+        """Resta `weight` a cada término y lo elimina al llegar a cero"""
+        for term in terms:
+            remaining = self._weights.get(term, 0) - weight
+            if remaining > 0:
+                self._weights[term] = remaining
+            elif term in self._weights:
+                del self._weights[term]
+                del self._display[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Devuelve los `limit` términos de mayor peso que empiezan por `prefix`
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        lo = bisect_left(self._terms, prefix)
+        hi = bisect_left(self._terms, prefix + '\uffff', lo, min(lo + MAX_PREFIX_SCAN, len(self._terms)))
+        candidates = self._terms[lo:hi]
+        best = heapq.nlargest(limit, candidates, key=lambda t: (self._weights[t], -len(t)))
+        return [self._display[term] for term in best]
+
+
+def trigrams(term: str) -> Set[str]:
+    """
+    Trigramas de un término con marcas de inicio y fin: 'sol' -> {'$so', 'sol', 'ol$'}
+    """
+    padded = f'${term}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(term: str) -> int:
+    """Errores tolerados según la longitud: 1 hasta 5 letras, 2 a partir de ahí"""
+    return 1 if len(term) <= 5 else 2
+
+
+def edits1(word: str) -> Set[str]:
+    """
+    Variantes de `word` a un error: borrado, transposición, sustitución o inserción
+    """
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = {a + b[1:] for a, b in splits if b}
+    variants.update(a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1)
+    variants.update(a + c + b[1:] for a, b in splits if b for c in EDIT_ALPHABET)
+    variants.update(a + c + b for a, b in splits for c in EDIT_ALPHABET)
+    variants.discard(word)
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Distancia de Damerau-Levenshtein (transposiciones contiguas cuentan como 1)
+    Devuelve limit + 1 en cuanto se sabe que la distancia supera `limit`
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        # La transposición mira dos filas atrás, así que ambas deben superar el límite
+        if min(current) > limit and min(previous) >= limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class TermIndex:
+    """
+    Índice invertido término -> posts, con un índice de trigramas sobre el
+    vocabulario para encontrar términos parecidos sin recorrer los posts
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        # Después de copy() los conjuntos se comparten con la copia: cada lado
+        # duplica un conjunto la primera vez que lo modifica y lo apunta aquí
+        # (None = ningún conjunto compartido)
+        self._owned_postings: Optional[Set[str]] = None
+        self._owned_grams: Optional[Set[str]] = None
+
+    @classmethod
+    def from_postings(cls, postings: Dict[str, Iterable[int]]) -> 'TermIndex':
+        """Construye el índice a partir de un diccionario término -> posts"""
+        index = cls()
+        index._postings = {term: set(posts) for term, posts in postings.items()}
+        grams = index._grams
+        for term in index._postings:
+            for gram in trigrams(term):
+                grams.setdefault(gram, set()).add(term)
+        return index
+
+    def copy(self) -> 'TermIndex':
+        """
+        Copia para copy-on-write en BlogStorage: O(términos + trigramas) en
+        referencias. Los conjuntos de posts y de términos se comparten y cada
+        índice copia uno solo cuando lo modifica (ver _writable)
+        """
+        clone = TermIndex()
+        clone._postings = dict(self._postings)
+        clone._grams = dict(self._grams)
+        clone._owned_postings, clone._owned_grams = set(), set()
+        self._owned_postings, self._owned_grams = set(), set()
+        return clone
+
+    @staticmethod
+    def _writable(table: Dict[str, Set], owned: Optional[Set[str]], key: str) -> Optional[Set]:
+        """Conjunto de `key` listo para modificar (se duplica si se comparte con una copia)"""
+        values = table.get(key)
+        if values is not None and owned is not None and key not in owned:
+            values = table[key] = set(values)
+            owned.add(key)
+        return values
+
+    @staticmethod
+    def _create(table: Dict[str, Set], owned: Optional[Set[str]], key: str) -> Set:
+        values = table[key] = set()
+        if owned is not None:
+            owned.add(key)
+        return values
+
+    def add(self, post_id: int, terms: Iterable[str]):
+        """Registra que el post contiene los términos dados"""
+        for term in terms:
+            posting = self._writable(self._postings, self._owned_postings, term)
+            if posting is None:
+                posting = self._create(self._postings, self._owned_postings, term)
+                for gram in trigrams(term):
+                    gram_terms = self._writable(self._grams, self._owned_grams, gram)
+                    if gram_terms is None:
+                        gram_terms = self._create(self._grams, self._owned_grams, gram)
+                    gram_terms.add(term)
+            posting.add(post_id)
+
+    def remove(self, post_id: int, terms: Iterable[str]):
+        """Quita el post de los términos dados (y los términos que quedan sin posts)"""
+        for term in terms:
+            posting = self._writable(self._postings, self._owned_postings, term)
+            if posting is None:
+                continue
+            posting.discard(post_id)
+            if not posting:
+                del self._postings[term]
+                for gram in trigrams(term):
+                    gram_terms = self._writable(self._grams, self._owned_grams, gram)
+                    gram_terms.discard(term)
+                    if not gram_terms:
+                        del self._grams[gram]
+
+    def terms_containing(self, fragment: str) -> List[str]:
+        """
+        Términos del vocabulario que contienen `fragment`
+        Los candidatos salen de intersecar los trigramas del fragmento
+        """
+        if len(fragment) < 3:
+            candidates = self._postings.keys()
+        else:
+            gram_sets = sorted(
+                (self._grams.get(fragment[i:i + 3], set()) for i in range(len(fragment) - 2)),
+                key=len
+            )
+            candidates = gram_sets[0].intersection(*gram_sets[1:])
+        return [term for term in candidates if fragment in term]
+
+    def search(self, query: str) -> Set[int]:
+        """
+        Posts en los que cada palabra de la query aparece dentro de algún término
+        Las palabras de una letra no están indexadas: se buscan dentro de
+        todos los términos del vocabulario
+        """
+        result: Optional[Set[int]] = None
+        for word in query_words(query):
+            posts = set()
+            for term in self.terms_containing(word):
+                posts.update(self._postings[term])
+            result = posts if result is None else result & posts
+            if not result:
+                break
+        return result or set()
+
+    def similar_terms(self, word: str) -> Dict[str, int]:
+        """
+        Términos del vocabulario a distancia de edición tolerable de `word`
+        Devuelve {término: distancia}
+        """
+        limit = max_typos(word)
+        if word in self._postings:
+            matches = {word: 0}
+        else:
+            matches = {}
+        # Filtro de candidatos: cada error destruye como mucho 4 trigramas (una
+        # transposición cambia dos letras seguidas), así que un término
+        # parecido comparte al menos len(grams) - 4 * limit
+        grams = trigrams(word)
+        bound = len(grams) - 4 * limit
+        if bound < 1:
+            # Palabra corta: un solo error puede no dejar ningún trigrama en
+            # común ('nbue' / 'nube'), así que se prueban sus variantes a un error.
+            # Dos errores que borren todos los trigramas no se detectan
+            for variant in edits1(word):
+                if variant in self._postings:
+                    matches.setdefault(variant, 1)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        min_shared = max(1, bound)
+        shortlist = heapq.nlargest(
+            FUZZY_SHORTLIST,
+            (term for term, count in shared.items()
+             if count >= min_shared and abs(len(term) - len(word)) <= limit),
+            key=shared.__getitem__
+        )
+        for term in shortlist:
+            if term not in matches:
+                distance = edit_distance(word, term, limit)
+                if distance <= limit:
+                    matches[term] = distance
+        return matches
+
+    def fuzzy_search(self, query: str) -> Tuple[Dict[int, int], Set[str]]:
+        """
+        Posts que contienen, para cada palabra de la query, un término parecido
+        Devuelve ({post_id: suma de distancias}, términos que coincidieron);
+        menor distancia = más relevante
+        """
+        words = list(vocabulary(query))
+        scores: Dict[int, int] = {}
+        matched: Set[str] = set()
+        for index, word in enumerate(words):
+            best: Dict[int, int] = {}
+            similar = self.similar_terms(word)
+            matched.update(similar)
+            for term, distance in similar.items():
+                for post_id in self._postings[term]:
+                    if distance < best.get(post_id, distance + 1):
+                        best[post_id] = distance
+            if index == 0:
+                scores = best
+            else:
+                scores = {pid: scores[pid] + d for pid, d in best.items() if pid in scores}
+            if not scores:
+                break
+        return scores, matched
@@ -0,0 +1,68 @@
+from datetime import date
+from typing import Dict, Optional
+
+
+class BlogStats:
+    """
+    Agregados del blog (posts, palabras, posts por autor y por día)
+
+    BlogStorage los actualiza en cada escritura, así que leerlos nunca
+    recorre los posts. El diccionario de to_dict() se guarda hasta la
+    siguiente escritura: las lecturas repetidas son O(1).
+    """
+
+    def __init__(self):
+        self.total_posts = 0
+        self.total_words = 0
+        self._by_author: Dict[str, int] = {}
+        self._by_day: Dict[date, int] = {}
+        self._cached: Optional[Dict] = None
+
+    def copy(self) -> 'BlogStats':
+        """Copia independiente (para copy-on-write en BlogStorage)"""
+        clone = BlogStats()
+        clone.total_posts = self.total_posts
+        clone.total_words = self.total_words
+        clone._by_author = dict(self._by_author)
+        clone._by_day = dict(self._by_day)
+        return clone
+
+    def add(self, author: str, day: date, words: int):
+        """Cuenta un post nuevo"""
+        self.total_posts += 1
+        self.total_words += words
+        self._by_author[author] = self._by_author.get(author, 0) + 1
+        self._by_day[day] = self._by_day.get(day, 0) + 1
+        self._cached = None
+
+    def remove(self, author: str, day: date, words: int):
+        """Descuenta un post borrado (autores y días sin posts desaparecen)"""
+        self.total_posts -= 1
+        self.total_words -= words
+        for counts, key in ((self._by_author, author), (self._by_day, day)):
+            remaining = counts[key] - 1
+            if remaining:
+                counts[key] = remaining
+            else:
+                del counts[key]
+        self._cached = None
+
+    def change_words(self, delta: int):
+        """Ajusta el total de palabras tras editar un post"""
+        if delta:
+            self.total_words += delta
+            self._cached = None
+
+    def to_dict(self) -> Dict:
+        """
+        Agregados para JSON/plantillas (no modificar el resultado: se reutiliza)
+        """
+        if self._cached is None:
+            self._cached = {
+                'total_posts': self.total_posts,
+                'total_words': self.total_words,
+                'total_authors': len(self._by_author),
+                'posts_by_author': dict(sorted(self._by_author.items())),
+                'posts_by_day': {day.isoformat(): count for day, count in sorted(self._by_day.items())}
+            }
+        return self._cached
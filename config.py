@@ -1,6 +1,11 @@
 import os
 
+# Directorio raíz del proyecto (para rutas por defecto)
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+
 class Config:
+    """Configuración común a todos los entornos"""
     # Clave secreta para sesiones y formularios
     # En producción, esto debería ser una variable de entorno
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -8,10 +13,75 @@ class Config:
     # Configuración para el modo debug
     # True = muestra errores detallados, recarga automática
     # False = modo producción, más seguro
-    DEBUG = os.environ.get('FLASK_DEBUG') or True
+    DEBUG = False
+
+    # Recargar plantillas si cambian en disco (None = igual que DEBUG)
+    # Con recarga activa Jinja revisa los archivos en cada render
+    TEMPLATES_AUTO_RELOAD = None
+
+    # Directorio para la caché de bytecode de plantillas Jinja (None = sin caché)
+    JINJA_BYTECODE_CACHE_DIR = None
+
+    # Interpretar el contenido de los posts como Markdown. El paquete markdown es
+    # opcional y no está en requirements.txt: instalarlo aparte (pip install
+    # markdown) para usar esta opción; sin él se muestran párrafos simples
+    MARKDOWN_ENABLED = os.environ.get('MARKDOWN_ENABLED', 'false').lower() == 'true'
+
+    # Comprimir en memoria los posts con más de N caracteres (0 = desactivado)
+    # y cuántos cuerpos descomprimidos se mantienen en caché
+    COMPRESS_THRESHOLD = int(os.environ.get('COMPRESS_THRESHOLD', 0))
+    BODY_CACHE_SIZE = int(os.environ.get('BODY_CACHE_SIZE', 128))
+
+    # Reconstrucción de índices: procesos (1 = en serie, 0 = uno por CPU) y
+    # tamaño mínimo del corpus para usar el pool en vez de hacerlo en serie.
+    # En serie por defecto: el pool solo compensa con varios núcleos libres
+    # (medirlo antes con el corpus real: con 10^6 posts, 1 CPU y 6 GB, en serie
+    # tarda 88 s y con 2 procesos no cabe en memoria). Solo se usa tras
+    # importar posts: la carga del log al arrancar va siempre en serie
+    REBUILD_WORKERS = int(os.environ.get('REBUILD_WORKERS', 1))
+    PARALLEL_REBUILD_MIN_POSTS = int(os.environ.get('PARALLEL_REBUILD_MIN_POSTS', 10000))
+
+    # Persistencia opcional: log de cambios en disco (None = solo memoria)
+    # escrito en grupos de hasta PERSIST_MAX_BATCH cambios o cada PERSIST_MAX_DELAY
+    # segundos; con PERSIST_QUEUE_SIZE cambios pendientes las escrituras esperan
+    PERSIST_PATH = os.environ.get('PERSIST_PATH') or None
+    PERSIST_MAX_BATCH = int(os.environ.get('PERSIST_MAX_BATCH', 256))
+    PERSIST_MAX_DELAY = float(os.environ.get('PERSIST_MAX_DELAY', 0.05))
+    PERSIST_QUEUE_SIZE = int(os.environ.get('PERSIST_QUEUE_SIZE', 10000))
 
     # Puerto donde correrá la aplicación
     PORT = int(os.environ.get('PORT', 5000))
 
     # Host - 0.0.0.0 permite conexiones externas (necesario para Docker)
-    HOST = os.environ.get('HOST', '0.0.0.0')
\ No newline at end of file
+    HOST = os.environ.get('HOST', '0.0.0.0')
+
+
+class DevelopmentConfig(Config):
+    """Desarrollo local: errores detallados y recarga de plantillas"""
+    DEBUG = os.environ.get('FLASK_DEBUG', '1') != '0'
+    TEMPLATES_AUTO_RELOAD = True
+
+
+class TestingConfig(Config):
+    """Tests automatizados"""
+    TESTING = True
+    WTF_CSRF_ENABLED = False  # Desactivar CSRF para testing
+    PERSIST_PATH = None  # Los tests nunca escriben el log de cambios en disco
+
+
+class ProductionConfig(Config):
+    """Producción: sin debug, plantillas fijas y bytecode cacheado en disco"""
+    DEBUG = False
+    TEMPLATES_AUTO_RELOAD = False
+    JINJA_BYTECODE_CACHE_DIR = (
+        os.environ.get('JINJA_BYTECODE_CACHE_DIR') or os.path.join(basedir, '.jinja_cache')
+    )
+
+
+# Perfiles disponibles, seleccionados con la variable de entorno FLASK_ENV
+config = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+    'default': DevelopmentConfig
+}
@@ -0,0 +1,390 @@
+"""
+Generador de carga en lazo abierto (open-loop) para DevBlog
+
+Arranca la aplicación real en un puerto de loopback (o usa una ya levantada
+con --url) y lanza peticiones a ritmos de llegada fijos, sin esperar a que
+terminen las anteriores. La latencia se mide desde el instante en que la
+petición *debía* salir, así que las colas del servidor (y las del propio
+cliente si se satura) cuentan en la latencia en vez de esconderse.
+
+Ejemplos:
+    python loadtest.py --server dev --rate 100 --duration 30
+    python loadtest.py --server production --workers 2 --threads 8 --rate 400
+    python loadtest.py --url http://127.0.0.1:5000 --mix index=1,post=4,search=2,write=1
+
+El resultado (percentiles p50/p99/p999, histograma y throughput por
+endpoint) se imprime en JSON o se guarda con --output.
+
+Notas:
+- El modo production usa gunicorn (pip install gunicorn), que no es una
+  dependencia de la aplicación.
+- Los posts viven en memoria de cada proceso: con --workers > 1 cada
+  worker de gunicorn tiene sus propios posts y las escrituras no se ven
+  entre ellos.
+"""
+import argparse
+import heapq
+import http.client
+import json
+import math
+import os
+import queue
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+# Proporción por defecto de cada tipo de petición
+DEFAULT_MIX = {'index': 2, 'post': 4, 'api_posts': 2, 'search': 3, 'write': 1}
+# Percentiles que se publican en el resultado
+PERCENTILES = (50, 90, 99, 99.9)
+# Límites superiores (ms) de los cubos del histograma de latencias
+HISTOGRAM_BOUNDS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Tiempo máximo de espera a que el servidor responda en /api/health
+SERVER_START_TIMEOUT = 30
+
+
+class Request(NamedTuple):
+    """Petición concreta que se envía al servidor"""
+    method: str
+    path: str
+    body: Optional[bytes] = None
+
+
+class Sample(NamedTuple):
+    """Resultado de una petición (latencia en segundos, None si falló la conexión)"""
+    kind: str
+    scheduled: float
+    latency: Optional[float]
+    status: Optional[int]
+
+
+# ================================
+# ESTADÍSTICAS
+# ================================
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Percentil por rango más cercano sobre una lista ya ordenada
+    (p999 necesita al menos 1000 muestras para no ser el máximo)
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(round(p * len(values) / 100, 9)))  # round: 99.9 * 1000 / 100 no es exacto
+    return values[rank - 1]
+
+
+def histogram(values: List[float]) -> List[Dict]:
+    """Cuenta las latencias (ms) de cada cubo; el último (le=None) no tiene límite"""
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    bound_index = 0
+    for value in values:  # Ordenadas: los cubos se recorren una sola vez
+        while bound_index < len(HISTOGRAM_BOUNDS_MS) and value > HISTOGRAM_BOUNDS_MS[bound_index]:
+            bound_index += 1
+        counts[bound_index] += 1
+    bounds = list(HISTOGRAM_BOUNDS_MS) + [None]
+    return [{'le_ms': bound, 'count': count} for bound, count in zip(bounds, counts)]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict:
+    """Resumen de un grupo de muestras: peticiones, errores, throughput y latencias"""
+    latencies = sorted(s.latency * 1000 for s in samples if s.latency is not None)
+    errors = sum(1 for s in samples if s.status is None or s.status >= 400)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            **{f'p{p:g}'.replace('.', ''): round(percentile(latencies, p), 3) for p in PERCENTILES},
+            'max': round(latencies[-1], 3) if latencies else 0.0
+        },
+        'histogram': histogram(latencies)
+    }
+
+
+# ================================
+# PLAN DE CARGA
+# ================================
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'index=1,post=4' -> {'index': 1.0, 'post': 4.0}"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Tipo de petición desconocido: {name!r} (usa {", ".join(DEFAULT_MIX)})')
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError('La mezcla necesita al menos un peso mayor que cero')
+    return mix
+
+
+def arrival_schedule(mix: Dict[str, float], rate: float, duration: float,
+                     poisson: bool = False, seed: int = 0) -> List[Tuple[float, str]]:
+    """
+    Instantes de llegada (segundos desde el inicio) de cada petición
+
+    Cada tipo tiene su propio ritmo fijo (rate * peso / suma de pesos) y los
+    flujos se mezclan por tiempo. Con poisson=True los intervalos son
+    exponenciales en vez de constantes.
+    """
+    rng = random.Random(seed)
+    total_weight = sum(mix.values())
+    streams = []
+    for kind, weight in mix.items():
+        kind_rate = rate * weight / total_weight
+        if kind_rate <= 0:
+            continue
+        if poisson:
+            times, t = [], rng.expovariate(kind_rate)
+            while t < duration:
+                times.append(t)
+                t += rng.expovariate(kind_rate)
+        else:
+            # Desfase aleatorio para que los flujos no coincidan siempre en el mismo instante
+            interval = 1 / kind_rate
+            offset = rng.uniform(0, interval)
+            times = [offset + i * interval for i in range(math.ceil((duration - offset) * kind_rate))]
+        streams.append([(t, kind) for t in times if t < duration])
+    return list(heapq.merge(*streams))
+
+
+class RequestFactory:
+    """
+    Construye las peticiones de cada tipo con ids y búsquedas reales del blog
+    """
+
+    def __init__(self, post_ids: List[int], queries: List[str], seed: int = 0):
+        self.post_ids = post_ids or [1]
+        self.queries = queries or ['docker']
+        self._rng = random.Random(seed)
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def build(self, kind: str) -> Request:
+        with self._lock:  # random.Random no es seguro entre hilos
+            post_id = self._rng.choice(self.post_ids)
+            query = self._rng.choice(self.queries)
+            self._written += kind == 'write'
+            written = self._written
+        if kind == 'index':
+            return Request('GET', '/')
+        if kind == 'post':
+            return Request('GET', f'/post/{post_id}')
+        if kind == 'api_posts':
+            return Request('GET', '/api/posts')
+        if kind == 'search':
+            return Request('GET', f'/api/search?q={quote(query)}')
+        body = json.dumps({
+            'title': f'Post de carga {written}',
+            'content': f'Contenido generado por loadtest.py sobre {query} ({written})',
+            'author': 'loadtest'
+        }).encode('utf-8')
+        return Request('POST', '/api/posts', body)
+
+
+# ================================
+# EJECUCIÓN
+# ================================
+
+def run_load(base_url: str, schedule: List[Tuple[float, str]], build: Callable[[str], Request],
+             connections: int = 32, timeout: float = 10.0) -> Tuple[List[Sample], float]:
+    """
+    Lanza las peticiones en sus instantes programados con `connections` hilos cliente
+
+    Un hilo programador encola cada petición a su hora sin esperar respuestas;
+    los hilos cliente las envían por conexiones persistentes. Devuelve las
+    muestras y la duración real de la prueba.
+    """
+    url = urlsplit(base_url)
+    pending: queue.Queue = queue.Queue()
+    samples: List[Sample] = []
+    start = time.perf_counter() + 0.05  # Margen para que arranquen los hilos cliente
+
+    def client():
+        connection = http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+        while True:
+            job = pending.get()
+            if job is None:
+                break
+            scheduled, kind = job
+            req = build(kind)
+            headers = {'Content-Type': 'application/json'} if req.body else {}
+            try:
+                connection.request(req.method, req.path, body=req.body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()  # Se reabre sola en la siguiente petición
+                samples.append(Sample(kind, scheduled, None, None))
+                continue
+            samples.append(Sample(kind, scheduled, time.perf_counter() - start - scheduled, status))
+        connection.close()
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for scheduled, kind in schedule:
+        delay = start + scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        pending.put((scheduled, kind))
+    for _ in threads:
+        pending.put(None)
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def fetch_json(base_url: str, path: str) -> Dict:
+    url = urlsplit(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port, timeout=5)
+    try:
+        connection.request('GET', path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def discover_targets(base_url: str) -> Tuple[List[int], List[str]]:
+    """Ids de los posts existentes y palabras de sus títulos para las búsquedas"""
+    posts = fetch_json(base_url, '/api/posts')['data']
+    queries = sorted({word.lower() for post in posts for word in post['title'].split()
+                      if len(word) >= 4 and word.isalpha()})
+    return [post['id'] for post in posts], queries
+
+
+# ================================
+# SERVIDOR
+# ================================
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(mode: str, port: int, workers: int, threads: int) -> Tuple[List[str], Dict]:
+    """Comando y entorno para arrancar la aplicación en el modo pedido"""
+    env = dict(os.environ)
+    if mode == 'dev':
+        env['FLASK_ENV'] = 'development'
+        return [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--host', '127.0.0.1',
+                '--port', str(port), '--no-reload', '--no-debugger', '--with-threads'], env
+    if shutil.which('gunicorn') is None:
+        raise RuntimeError('El modo production necesita gunicorn: pip install gunicorn')
+    env['FLASK_ENV'] = 'production'
+    return ['gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+            '--threads', str(threads), '--log-level', 'warning', 'app:create_app()'], env
+
+
+def start_server(command: List[str], env: Dict, base_url: str) -> subprocess.Popen:
+    """Arranca el servidor y espera a que /api/health responda"""
+    # El log del servidor va a un fichero: una tubería sin leer se llena
+    # (el servidor de desarrollo escribe una línea por petición) y lo bloquea
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                               stdout=subprocess.DEVNULL, stderr=log)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f'El servidor terminó al arrancar:\n{log.read().decode()}')
+        try:
+            fetch_json(base_url, '/api/health')
+            return process
+        except (OSError, ValueError):
+            time.sleep(0.1)
+    stop_server(process)
+    raise RuntimeError(f'El servidor no respondió en {SERVER_START_TIMEOUT}s')
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ================================
+# LÍNEA DE COMANDOS
+# ================================
+
+def build_report(samples: List[Sample], elapsed: float, warmup: float, settings: Dict) -> Dict:
+    """Resultado en JSON: global y por tipo de petición, sin las muestras de calentamiento"""
+    measured = [s for s in samples if s.scheduled >= warmup]
+    window = max(elapsed - warmup, 0.0)
+    kinds = sorted({s.kind for s in measured})
+    return {
+        'settings': settings,
+        'duration_s': round(window, 3),
+        'overall': summarize(measured, window),
+        'endpoints': {kind: summarize([s for s in measured if s.kind == kind], window)
+                      for kind in kinds}
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Prueba de carga en lazo abierto contra DevBlog')
+    parser.add_argument('--server', choices=('dev', 'production'), default='dev',
+                        help='servidor a arrancar: dev (Flask) o production (gunicorn)')
+    parser.add_argument('--url', help='usar un servidor ya levantado en vez de arrancar uno')
+    parser.add_argument('--rate', type=float, default=50, help='peticiones por segundo en total')
+    parser.add_argument('--duration', type=float, default=10, help='segundos de carga')
+    parser.add_argument('--warmup', type=float, default=1, help='segundos iniciales que no se miden')
+    parser.add_argument('--mix', type=parse_mix, default=dict(DEFAULT_MIX),
+                        help='pesos por tipo, p. ej. index=2,post=4,api_posts=2,search=3,write=1')
+    parser.add_argument('--poisson', action='store_true', help='llegadas de Poisson en vez de constantes')
+    parser.add_argument('--connections', type=int, default=32, help='hilos cliente concurrentes')
+    parser.add_argument('--workers', type=int, default=1, help='procesos de gunicorn (modo production)')
+    parser.add_argument('--threads', type=int, default=8, help='hilos por proceso de gunicorn')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='fichero donde guardar el JSON (por defecto, la salida estándar)')
+    args = parser.parse_args(argv)
+
+    process = None
+    base_url = args.url
+    settings = {key: value for key, value in vars(args).items() if key != 'output'}
+    try:
+        if base_url is None:
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            command, env = server_command(args.server, port, args.workers, args.threads)
+            settings['server_command'] = ' '.join(command)
+            process = start_server(command, env, base_url)
+        else:
+            settings['server'] = 'external'
+
+        post_ids, queries = discover_targets(base_url)
+        factory = RequestFactory(post_ids, queries, seed=args.seed)
+        schedule = arrival_schedule(args.mix, args.rate, args.duration, args.poisson, args.seed)
+        samples, elapsed = run_load(base_url, schedule, factory.build, args.connections)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    report = build_report(samples, elapsed, args.warmup, settings)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
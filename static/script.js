@@ -176,6 +176,52 @@ function saveSearchQuery(query) {
   localStorage.setItem('devblog-searches', JSON.stringify(searches));
 }
 
+/* ================================
+SUGERENCIAS DE BÚSQUEDA (AUTOCOMPLETAR)
+================================ */
+function initializeSearchSuggestions() {
+  const searchInputs = document.querySelectorAll('input[name="q"]');
+  searchInputs.forEach((input, index) => {
+    const datalist = document.createElement('datalist');
+    datalist.id = `search-suggestions-${index}`;
+    input.setAttribute('list', datalist.id);
+    input.setAttribute('autocomplete', 'off');
+    input.parentNode.appendChild(datalist);
+
+    let controller = null;
+    const fetchSuggestions = debounce(function () {
+      const query = input.value.trim();
+      // Cancelar la petición anterior si todavía no respondió
+      if (controller) {
+        controller.abort();
+      }
+      if (query.length < 2) {
+        datalist.innerHTML = '';
+        return;
+      }
+
+      controller = new AbortController();
+      fetch(`/api/suggest?q=${encodeURIComponent(query)}`, { signal: controller.signal })
+        .then(response => response.json())
+        .then(result => {
+          datalist.innerHTML = '';
+          result.data.forEach(suggestion => {
+            const option = document.createElement('option');
+            option.value = suggestion;
+            datalist.appendChild(option);
+          });
+        })
+        .catch(error => {
+          if (error.name !== 'AbortError') {
+            console.error('Error obteniendo sugerencias:', error);
+          }
+        });
+    }, 150);
+
+    input.addEventListener('input', fetchSuggestions);
+  });
+}
+
 /* ================================
 ANIMACIONES Y EFECTOS
 ================================ */
@@ -298,4 +344,6 @@ window.previewPost = function () {
   previewWindow.document.close();
 };
 
+document.addEventListener('DOMContentLoaded', initializeSearchSuggestions);
+
 console.log('📱 DevBlog JavaScript cargado correctamente');
@@ -2,6 +2,9 @@ import pytest
 from app import create_app
 from app.models import blog_storage
 
+# Estado inicial (posts de ejemplo) al que se vuelve antes de cada test
+initial_state = blog_storage.snapshot()
+
 
 @pytest.fixture
 def app():
@@ -13,9 +16,7 @@ def app():
     - Se ejecuta antes de cada test que lo necesite
     - Garantiza un estado limpio para cada prueba
     """
-    app = create_app()
-    app.config['TESTING'] = True
-    app.config['WTF_CSRF_ENABLED'] = False  # Desactivar CSRF para testing
+    app = create_app('testing')  # Perfil TestingConfig de config.py
     return app
 
 
@@ -50,12 +51,8 @@ def reset_storage():
     - Garantiza que cada test empiece con datos limpios
     - Evita que los tests se afecten entre sí
     """
-    # Limpiar todos los posts
-    blog_storage._posts.clear()
-    blog_storage._next_id = 1
-
-    # Recrear posts de ejemplo para tests consistentes
-    blog_storage._create_sample_posts()
+    # Volver a los posts de ejemplo en O(1) restaurando la instantánea inicial
+    blog_storage.restore(initial_state)
 
     yield  # Aquí se ejecuta el test
 
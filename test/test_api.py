@@ -1,6 +1,8 @@
 import pytest
 import json
-from app.models import blog_storage
+import time
+from datetime import datetime, timezone
+from app.models import blog_storage, BlogPost
 
 
 class TestAPIEndpoints:
@@ -276,3 +278,560 @@ class TestAPIEndpoints:
         assert data['status'] == 'healthy'
         assert data['version'] == '1.0.0'
         assert 'timestamp' in data
+
+    def test_changes_since_returns_only_deltas(self, client):
+        """
+        Test: GET /api/changes?since=<seq> devuelve solo los cambios nuevos
+        """
+        response = client.get('/api/changes')
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data['count'] == 2  # Creación de los 2 posts de ejemplo
+        last_seq = data['last_seq']
+
+        client.put('/api/posts/1', data=json.dumps({'title': 'Nuevo título'}),
+                   content_type='application/json')
+        client.delete('/api/posts/2')
+
+        response = client.get(f'/api/changes?since={last_seq}')
+        data = json.loads(response.data)
+        assert data['reset'] is False
+        assert [c['op'] for c in data['data']] == ['update', 'delete']
+        assert data['data'][0]['data']['title'] == 'Nuevo título'
+        assert data['data'][1]['id'] == 2
+        assert data['last_seq'] == last_seq + 2
+
+    def test_changes_long_poll_timeout(self, client):
+        """
+        Test: Long-poll sin cambios nuevos devuelve lista vacía al expirar
+        """
+        last_seq = blog_storage.last_seq
+        response = client.get(f'/api/changes?since={last_seq}&wait=0.05')
+        data = json.loads(response.data)
+        assert data['count'] == 0
+        assert data['last_seq'] == last_seq
+
+    def test_changes_reset_when_log_truncated(self, client):
+        """
+        Test: Si los cambios pedidos ya salieron del registro se pide resincronizar
+        CASO EDGE: Cliente demasiado atrasado
+        """
+        blog_storage._changes.popleft()
+        response = client.get('/api/changes?since=0')
+        data = json.loads(response.data)
+        assert data['reset'] is True
+        assert data['count'] == 0
+
+    def test_changes_reset_when_since_is_ahead(self, client):
+        """
+        Test: Un `since` posterior a la última secuencia (tras reinicio o restore) pide resincronizar
+        CASO EDGE: El long-poll responde sin esperar al timeout
+        """
+        since = blog_storage.last_seq + 500
+        data = json.loads(client.get(f'/api/changes?since={since}').data)
+        assert data['reset'] is True
+        assert data['last_seq'] == blog_storage.last_seq
+        started = time.monotonic()
+        data = json.loads(client.get(f'/api/changes?since={since}&wait=5').data)
+        assert data['reset'] is True
+        assert time.monotonic() - started < 1
+
+    def test_changes_invalid_since(self, client):
+        """
+        Test: GET /api/changes con since no numérico devuelve 400
+        """
+        response = client.get('/api/changes?since=abc')
+        assert response.status_code == 400
+
+    def test_changes_event_stream(self, client):
+        """
+        Test: GET /api/changes?stream=1 emite los cambios como Server-Sent Events
+        """
+        response = client.get('/api/changes?since=1&stream=1', buffered=False)
+        assert response.mimetype == 'text/event-stream'
+        first_event = next(response.iter_encoded()).decode()
+        response.close()
+        assert 'id: 2' in first_event
+        assert 'event: change' in first_event
+
+    def test_filter_posts_by_author(self, client):
+        """
+        Test: GET /api/posts?author= devuelve solo los posts de ese autor
+        """
+        blog_storage.create_post(BlogPost('Otro autor', 'Contenido', author='Alice'))
+        response = client.get('/api/posts?author=Alice')
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data['count'] == 1
+        assert data['data'][0]['author'] == 'Alice'
+
+        response = client.get('/api/posts?author=Nadie')
+        assert json.loads(response.data)['count'] == 0
+
+    def test_filter_posts_by_date_range(self, client):
+        """
+        Test: GET /api/posts?since=&until= filtra por fecha de creación
+        manteniendo el orden (más recientes primero)
+        """
+        for day in (1, 2, 3):
+            post = BlogPost(f'Post día {day}', 'Contenido', author='Alice')
+            post.created_at = datetime(2024, 1, day, 12, 0)
+            blog_storage.create_post(post)
+
+        response = client.get('/api/posts?since=2024-01-02&until=2024-01-03')
+        data = json.loads(response.data)
+        assert [p['title'] for p in data['data']] == ['Post día 3', 'Post día 2']
+
+        response = client.get('/api/posts?author=Alice&until=2024-01-01')
+        data = json.loads(response.data)
+        assert [p['title'] for p in data['data']] == ['Post día 1']
+
+    def test_filter_posts_by_date_with_timezone(self, client):
+        """
+        Test: Las fechas con zona horaria (Z, +00:00) se comparan en hora local
+        CASO EDGE: Fechas ISO con zona frente a fechas de posts sin zona
+        """
+        instant = datetime(2024, 1, 2, 12, 0, tzinfo=timezone.utc)
+        post = BlogPost('Con zona', 'Contenido')
+        post.created_at = instant.astimezone().replace(tzinfo=None)
+        blog_storage.create_post(post)
+
+        response = client.get('/api/posts?until=2024-01-02T12:00:00Z')
+        assert response.status_code == 200
+        assert [p['title'] for p in json.loads(response.data)['data']] == ['Con zona']
+
+        response = client.get('/api/posts?since=2024-01-02T12:00:01%2B00:00&until=2024-01-03')
+        assert response.status_code == 200
+        assert json.loads(response.data)['count'] == 0
+
+        response = client.get('/?until=2024-01-02T12:00:00Z')
+        assert response.status_code == 200
+        assert b'Con zona' in response.data
+
+    def test_filter_posts_invalid_date(self, client):
+        """
+        Test: GET /api/posts con fecha inválida devuelve 400
+        CASO EDGE: Formato de fecha incorrecto
+        """
+        response = client.get('/api/posts?since=ayer')
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['success'] is False
+
+    def test_suggest_completes_prefix(self, client):
+        """
+        Test: GET /api/suggest?q=prefijo devuelve términos que empiezan por el prefijo
+        """
+        response = client.get('/api/suggest?q=dock')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['success'] is True
+        assert data['data'][0] == 'docker'
+
+    def test_suggest_ignores_accents_and_completes_last_word(self, client):
+        """
+        Test: Las sugerencias ignoran acentos y completan solo la última palabra
+        """
+        response = client.get('/api/suggest?q=mi apli')
+        data = json.loads(response.data)
+        assert 'mi aplicación' in data['data']
+        assert 'mi aplicaciones' in data['data']
+
+    def test_suggest_updates_on_write(self, client):
+        """
+        Test: El vocabulario de sugerencias se actualiza al crear y borrar posts
+        """
+        assert json.loads(client.get('/api/suggest?q=kuber').data)['count'] == 0
+        post = blog_storage.create_post(BlogPost('Kubernetes', 'Orquestación'))
+        assert json.loads(client.get('/api/suggest?q=kuber').data)['data'] == ['kubernetes']
+        blog_storage.delete_post(post.id)
+        assert json.loads(client.get('/api/suggest?q=kuber').data)['count'] == 0
+
+    def test_suggest_empty_query(self, client):
+        """
+        Test: GET /api/suggest sin prefijo devuelve una lista vacía
+        """
+        response = client.get('/api/suggest?q=')
+        assert response.status_code == 200
+        assert json.loads(response.data)['data'] == []
+
+    def test_search_api_fuzzy_tolerates_typos(self, client):
+        """
+        Test: GET /api/search?fuzzy=1 encuentra posts aunque la query tenga errores
+        """
+        response = client.get('/api/search?q=dokcer')
+        assert json.loads(response.data)['count'] == 0
+
+        response = client.get('/api/search?q=dokcer&fuzzy=1')
+        data = json.loads(response.data)
+        assert data['fuzzy'] is True
+        assert data['count'] == 2  # Ambos posts mencionan Docker
+        assert data['data'][0]['title'] == 'Mi experiencia con Docker'  # Título primero
+
+    def test_search_single_letter_words(self, client):
+        """
+        Test: Las palabras de una letra se buscan dentro de los términos
+        CASO EDGE: Palabras más cortas que las que se indexan
+        """
+        data = json.loads(client.get('/api/search?q=a').data)
+        assert data['count'] == 2
+        data = json.loads(client.get('/api/search?q=C').data)
+        assert data['count'] == 2
+        data = json.loads(client.get('/api/search?q=y docker').data)
+        assert [p['id'] for p in data['data']] == [2, 1]
+
+    def test_search_fuzzy_short_word_transpositions(self, client):
+        """
+        Test: Las transposiciones en palabras cortas también se toleran
+        CASO EDGE: 'nbue' y 'wbe' no comparten ningún trigrama con 'nube' y 'web'
+        """
+        for query in ('flsak', 'falsk', 'nbue', 'wbe'):
+            results = blog_storage.search_posts(query, fuzzy=True)
+            assert [p.id for p in results] == [1], query
+
+    def test_search_api_fuzzy_requires_every_word(self, client):
+        """
+        Test: En modo fuzzy cada palabra de la query debe parecerse a un término del post
+        """
+        blog_storage.create_post(BlogPost('Contenedores', 'Los contenedores aislan procesos'))
+        response = client.get('/api/search?q=contenedroes aislan&fuzzy=1')
+        data = json.loads(response.data)
+        assert [p['title'] for p in data['data']] == ['Contenedores']
+
+        response = client.get('/api/search?q=contenedroes zzzzzz&fuzzy=1')
+        assert json.loads(response.data)['count'] == 0
+
+    def test_rendered_content_refreshed_on_update(self, client):
+        """
+        Test: El contenido procesado se cachea por versión y se recalcula al editar
+        """
+        post = blog_storage.get_post_by_id(1)
+        assert post.rendered is post.rendered  # Se calcula una sola vez
+
+        client.put('/api/posts/1', data=json.dumps({'content': 'Texto nuevo y corto'}),
+                   content_type='application/json')
+        post = blog_storage.get_post_by_id(1)
+        assert post.word_count == 4
+        assert post.summary == 'Texto nuevo y corto'
+        data = json.loads(client.get('/api/posts/1').data)
+        assert data['data']['summary'] == 'Texto nuevo y corto'
+
+    def test_writes_do_not_render_html(self, client):
+        """
+        Test: Crear y editar (registro de cambios, estadísticas) no genera el HTML;
+        se genera una sola vez al mostrar el post
+        """
+        post = blog_storage.create_post(BlogPost('Sin HTML', 'uno dos tres'))
+        assert post._rendered.html is None
+        post = blog_storage.update_post(post.id, content='uno dos')
+        assert post._rendered.html is None
+        assert blog_storage.stats()['total_words'] == \
+            sum(p.word_count for p in blog_storage.get_all_posts())
+
+        assert b'<p>uno dos</p>' in client.get(f'/post/{post.id}').data
+        assert post._rendered.html == '<p>uno dos</p>'
+
+    def test_markdown_rendering_when_enabled(self, client):
+        """
+        Test: Con MARKDOWN_ENABLED el contenido se procesa como Markdown sin HTML embebido
+        """
+        pytest.importorskip('markdown')
+        blog_storage.configure({'MARKDOWN_ENABLED': True})
+        try:
+            post = blog_storage.create_post(BlogPost('MD', '# Título\n\n**negrita** <b>x</b>'))
+            assert '<h1>Título</h1>' in post.html
+            assert '<strong>negrita</strong>' in post.html
+            assert '<b>' not in post.html
+        finally:
+            blog_storage.configure({'MARKDOWN_ENABLED': False})
+
+    def test_markdown_drops_unsafe_link_urls(self, client):
+        """
+        Test: Los enlaces e imágenes de Markdown con javascript: u otros esquemas pierden la URL
+        CASO EDGE: XSS con esquemas ofuscados (entidades, mayúsculas, espacios)
+        """
+        pytest.importorskip('markdown')
+        blog_storage.configure({'MARKDOWN_ENABLED': True})
+        try:
+            content = ('[a](javascript:alert(1)) [b](java&#115;cript:alert(1)) '
+                       '[c]( JavaScript:alert(1)) ![d](data:text/html,x) '
+                       '[e](https://example.com) [f](/post/1) <x@example.com>')
+            post = blog_storage.create_post(BlogPost('Enlaces', content))
+            html = post.html
+            assert 'javascript' not in html.lower() and 'java&#115;' not in html
+            assert 'data:' not in html
+            assert '<a href="https://example.com">e</a>' in html
+            assert '<a href="/post/1">f</a>' in html
+            assert '&#109;&#97;&#105;&#108;&#116;&#111;&#58;' in html  # mailto: del autoenlace
+        finally:
+            blog_storage.configure({'MARKDOWN_ENABLED': False})
+
+    def test_change_log_keeps_compressed_bodies(self, client):
+        """
+        Test: El registro de cambios guarda los cuerpos comprimidos y /api/changes los sirve en texto
+        """
+        blog_storage.configure({'COMPRESS_THRESHOLD': 100})
+        try:
+            since = blog_storage.last_seq
+            content = 'Terraform describe la infraestructura. ' * 50
+            post = blog_storage.create_post(BlogPost('Largo', content))
+            blog_storage.update_post(post.id, content=content + ' Fin')
+            updated = blog_storage.get_post_by_id(post.id)
+            # Los mismos bytes que el post: el registro no duplica el texto
+            assert list(blog_storage._changes)[-1]['data']['content'] is updated._body
+
+            data = json.loads(client.get(f'/api/changes?since={since}').data)
+            assert [c['data']['content'] for c in data['data']] == [content.strip(), content + ' Fin']
+            assert data['data'][1]['data']['version'] == 2
+        finally:
+            blog_storage.configure({'COMPRESS_THRESHOLD': 0})
+
+    def test_compressed_bodies_round_trip(self, client):
+        """
+        Test: Con COMPRESS_THRESHOLD los cuerpos largos se guardan comprimidos
+        y la API los devuelve igual; la búsqueda no necesita descomprimirlos
+        """
+        blog_storage.configure({'COMPRESS_THRESHOLD': 100, 'BODY_CACHE_SIZE': 8})
+        try:
+            content = 'Kubernetes orquesta contenedores. ' * 50
+            post = blog_storage.create_post(BlogPost('Largo', content))
+            assert post.compressed
+            assert len(post._body) < len(content) / 5
+            assert post._rendered.html is None
+            assert blog_storage.get_post_by_id(1).compressed  # Posts existentes también
+
+            blog_storage._body_cache.clear()
+            assert blog_storage.search_posts('kubernetes') == [post]
+            assert len(blog_storage._body_cache) == 0  # Nada descomprimido
+
+            data = json.loads(client.get(f'/api/posts/{post.id}').data)
+            assert data['data']['content'] == content.strip()
+            assert b'Kubernetes orquesta' in client.get(f'/post/{post.id}').data
+
+            client.put(f'/api/posts/{post.id}', data=json.dumps({'content': content + ' Fin'}),
+                       content_type='application/json')
+            post = blog_storage.get_post_by_id(post.id)
+            assert post.compressed
+            assert post.content.endswith('Fin')
+            # El post comprimido no guarda su HTML (solo estadísticas y resumen)
+            assert post._rendered.html is None
+
+            shown = blog_storage.get_post_by_id(2)
+            assert shown.compressed and shown.html  # El HTML va a la LRU, no al post
+            assert shown._rendered is None or shown._rendered.html is None
+        finally:
+            blog_storage.configure({'COMPRESS_THRESHOLD': 0})
+        assert not blog_storage.get_post_by_id(1).compressed
+
+    def test_search_matches_words_ignoring_accents(self, client):
+        """
+        Test: La búsqueda encuentra fragmentos de palabra y no distingue acentos
+        """
+        response = client.get('/api/search?q=revelacion')
+        data = json.loads(response.data)
+        assert [p['id'] for p in data['data']] == [2]
+
+        response = client.get('/api/search?q=contain docker')
+        data = json.loads(response.data)
+        assert [p['id'] for p in data['data']] == [1]
+
+    def test_snapshot_is_stable_during_writes(self, client):
+        """
+        Test: Una instantánea no ve las escrituras posteriores
+        """
+        snapshot = blog_storage.snapshot()
+        client.put('/api/posts/1', data=json.dumps({'title': 'Editado'}),
+                   content_type='application/json')
+        client.delete('/api/posts/2')
+        blog_storage.create_post(BlogPost('Nuevo', 'Contenido'))
+
+        assert len(snapshot) == 2
+        assert snapshot.get_post_by_id(1).title == '¡Bienvenido a DevBlog!'
+        assert [p.id for p in snapshot.get_all_posts()] == [2, 1]
+        assert [p.id for p in blog_storage.get_all_posts()] == [3, 1]
+
+    def test_restore_rolls_back_state_and_indexes(self, client):
+        """
+        Test: restore() vuelve al estado de la instantánea, índices incluidos
+        """
+        snapshot = blog_storage.snapshot()
+        last_seq = blog_storage.last_seq
+        blog_storage.create_post(BlogPost('Kubernetes', 'Orquestación', author='Alice'))
+        blog_storage.delete_post(1)
+
+        blog_storage.restore(snapshot)
+        assert len(blog_storage.get_all_posts()) == 2
+        assert blog_storage.filter_posts(author='Alice') == []
+        assert blog_storage.search_posts('kubernetes') == []
+        assert blog_storage.suggest('kuber') == []
+        assert blog_storage.last_seq == last_seq
+        assert blog_storage.create_post(BlogPost('Otro', 'Texto')).id == 3
+
+    def test_restored_snapshot_keeps_its_search_index(self, client):
+        """
+        Test: Las escrituras tras snapshot() no modifican los conjuntos del
+        índice de búsqueda que comparte la instantánea
+        """
+        snapshot = blog_storage.snapshot()
+        for _ in range(2):  # restore() deja la instantánea reutilizable
+            blog_storage.update_post(2, content='Texto sin la palabra buscada')
+            blog_storage.create_post(BlogPost('Docker otra vez', 'Más revelaciones'))
+            assert [p.id for p in blog_storage.search_posts('revelacion')] == [3]
+
+            blog_storage.restore(snapshot)
+            assert [p.id for p in blog_storage.search_posts('revelacion')] == [2]
+            assert [p.id for p in blog_storage.search_posts('docker')] == [2, 1]
+
+    def test_patch_updates_only_sent_fields(self, client):
+        """
+        Test: PATCH /api/posts/<id> cambia solo los campos enviados y sube la versión
+        """
+        original = blog_storage.get_post_by_id(1)
+        response = client.patch(
+            '/api/posts/1',
+            data=json.dumps({'title': 'Solo el título'}),
+            content_type='application/merge-patch+json'
+        )
+        assert response.status_code == 200
+        assert response.headers['ETag'] == '"1-2"'
+        data = json.loads(response.data)
+        assert data['data']['title'] == 'Solo el título'
+        assert data['data']['content'] == original.content
+        assert data['data']['version'] == 2
+
+    def test_patch_rejects_empty_or_null_fields(self, client):
+        """
+        Test: PATCH con título vacío o null devuelve 400 en vez de ignorarlo
+        CASO EDGE: Campos obligatorios borrados
+        """
+        for value in ('', '   ', None):
+            response = client.patch('/api/posts/1', data=json.dumps({'title': value}),
+                                    content_type='application/json')
+            assert response.status_code == 400
+        assert blog_storage.get_post_by_id(1).version == 1
+
+    def test_update_without_editable_fields_returns_400(self, client):
+        """
+        Test: PUT/PATCH sin título ni contenido devuelve 400 y no sube la versión
+        CASO EDGE: Solo campos desconocidos (no invalida los ETag de otros editores)
+        """
+        last_seq = blog_storage.last_seq
+        for method, body in ((client.patch, {'foo': 1}), (client.put, {'title': None, 'content': None})):
+            response = method('/api/posts/1', data=json.dumps(body), content_type='application/json')
+            assert response.status_code == 400
+        assert blog_storage.get_post_by_id(1).version == 1
+        assert blog_storage.last_seq == last_seq
+
+    def test_if_match_conflict_returns_412(self, client):
+        """
+        Test: If-Match con un ETag viejo devuelve 412 y no pisa la edición ajena
+        """
+        etag = client.get('/api/posts/1').headers['ETag']
+        first = client.patch('/api/posts/1', data=json.dumps({'title': 'Editor A'}),
+                             content_type='application/json', headers={'If-Match': etag})
+        assert first.status_code == 200
+
+        second = client.patch('/api/posts/1', data=json.dumps({'title': 'Editor B'}),
+                              content_type='application/json', headers={'If-Match': etag})
+        assert second.status_code == 412
+        assert second.headers['ETag'] == first.headers['ETag']
+        assert json.loads(second.data)['data']['title'] == 'Editor A'
+        assert blog_storage.get_post_by_id(1).title == 'Editor A'
+
+    def test_get_post_if_none_match_returns_304(self, client):
+        """
+        Test: GET con If-None-Match del ETag actual devuelve 304 sin cuerpo
+        """
+        etag = client.get('/api/posts/1').headers['ETag']
+        response = client.get('/api/posts/1', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_patch_prefer_return_minimal(self, client):
+        """
+        Test: Prefer: return=minimal responde 204 sin cuerpo y con el nuevo ETag
+        """
+        response = client.patch(
+            '/api/posts/1',
+            data=json.dumps({'content': 'Nuevo contenido'}),
+            content_type='application/json',
+            headers={'Prefer': 'return=minimal', 'If-Match': '"1-1"'}
+        )
+        assert response.status_code == 204
+        assert response.data == b''
+        assert response.headers['ETag'] == '"1-2"'
+        assert response.headers['Preference-Applied'] == 'return=minimal'
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_import_posts_rebuilds_indexes(self, client, workers):
+        """
+        Test: La importación masiva reconstruye los índices (en serie o con
+        un pool de procesos) igual que las escrituras individuales
+        """
+        blog_storage.configure({'PARALLEL_REBUILD_MIN_POSTS': 0, 'REBUILD_WORKERS': workers})
+        try:
+            posts = []
+            for day in range(1, 21):
+                post = BlogPost(f'Importado {day}', f'Contenido número {day} sobre Kubernetes',
+                                author=f'Autor {day % 3}')
+                post.created_at = datetime(2024, 1, day)
+                posts.append(post)
+            assert blog_storage.import_posts(posts) == 20
+        finally:
+            blog_storage.configure({})
+
+        assert len(blog_storage.get_all_posts()) == 22
+        assert [p.title for p in blog_storage.filter_posts(until=datetime(2024, 1, 2))] == \
+            ['Importado 2', 'Importado 1']
+        assert len(blog_storage.filter_posts(author='Autor 1')) == 7
+        assert len(blog_storage.search_posts('kubernetes')) == 20
+        assert len(blog_storage.search_posts('kubernetse', fuzzy=True)) == 20
+        assert blog_storage.suggest('kuber') == ['kubernetes']
+        assert blog_storage.get_post_by_id(3).word_count == 5
+        assert '<p>Contenido número 1 sobre Kubernetes</p>' in blog_storage.get_post_by_id(3).html
+
+        # El registro de cambios pide resincronizar a los clientes
+        data = json.loads(client.get('/api/changes?since=2').data)
+        assert data['reset'] is True
+
+    def test_stats_follow_writes(self, client):
+        """
+        Test: GET /api/stats refleja cada alta, edición y borrado sin recorrer los posts
+        """
+        initial = json.loads(client.get('/api/stats').data)['data']
+        assert initial['total_posts'] == 2
+        assert initial['posts_by_author'] == {'DevOps Student': 2}
+        words = initial['total_words']
+        assert words == sum(p.word_count for p in blog_storage.get_all_posts())
+
+        client.post('/api/posts', data=json.dumps({
+            'title': 'Stats', 'content': 'uno dos tres', 'author': 'Ana'
+        }), content_type='application/json')
+        client.patch('/api/posts/3', data=json.dumps({'content': 'uno dos'}),
+                     content_type='application/json')
+        client.delete('/api/posts/1')
+
+        stats = json.loads(client.get('/api/stats').data)['data']
+        assert stats['total_posts'] == 2
+        assert stats['total_authors'] == 2
+        assert stats['posts_by_author'] == {'Ana': 1, 'DevOps Student': 1}
+        assert stats['total_words'] == sum(p.word_count for p in blog_storage.get_all_posts())
+        assert sum(stats['posts_by_day'].values()) == 2
+
+    def test_stats_survive_restore_and_import(self, client):
+        """
+        Test: Los agregados vuelven con restore() y se recalculan al importar
+        """
+        before = blog_storage.snapshot()
+        blog_storage.delete_post(1)
+        assert blog_storage.stats()['total_posts'] == 1
+        blog_storage.restore(before)
+        assert blog_storage.stats()['total_posts'] == 2
+
+        post = BlogPost('Importado', 'cuatro palabras más aquí', author='Bob')
+        post.created_at = datetime(2024, 1, 15)
+        blog_storage.import_posts([post])
+        stats = blog_storage.stats()
+        assert stats['total_posts'] == 3
+        assert stats['posts_by_author']['Bob'] == 1
+        assert stats['posts_by_day']['2024-01-15'] == 1
+        assert stats['total_words'] == sum(p.word_count for p in blog_storage.get_all_posts())
@@ -0,0 +1,43 @@
+import pytest
+from app import create_app
+from config import ProductionConfig
+
+
+class TestConfigProfiles:
+    """
+    Pruebas de los perfiles de configuración (development / testing / production)
+    """
+
+    def test_testing_profile(self, app):
+        """
+        Test: El fixture usa el perfil de testing
+        """
+        assert app.config['TESTING'] is True
+        assert app.config['DEBUG'] is False
+
+    def test_development_is_default(self, monkeypatch):
+        """
+        Test: Sin FLASK_ENV se carga el perfil de desarrollo con recarga de plantillas
+        """
+        monkeypatch.delenv('FLASK_ENV', raising=False)
+        app = create_app()
+        assert app.config['DEBUG'] is True
+        assert app.jinja_env.auto_reload is True
+
+    def test_production_profile_caches_templates(self, monkeypatch, tmp_path):
+        """
+        Test: El perfil de producción desactiva debug y la recarga de plantillas
+        y guarda el bytecode compilado en disco
+        """
+        monkeypatch.setattr(ProductionConfig, 'JINJA_BYTECODE_CACHE_DIR', str(tmp_path))
+        monkeypatch.setenv('FLASK_ENV', 'production')
+        app = create_app()
+        assert app.config['DEBUG'] is False
+        assert app.jinja_env.auto_reload is False
+
+        result = app.test_cli_runner().invoke(args=['compile-templates'])
+        assert 'plantillas compiladas' in result.output
+        assert any(tmp_path.iterdir())
+
+        response = app.test_client().get('/')
+        assert response.status_code == 200
@@ -0,0 +1,79 @@
+import json
+import threading
+import pytest
+from werkzeug.serving import make_server
+import loadtest
+
+
+class TestLoadTestHarness:
+    """
+    Pruebas del generador de carga (loadtest.py)
+    """
+
+    def test_percentile_nearest_rank(self):
+        """
+        Test: Percentiles por rango más cercano
+        """
+        values = [float(v) for v in range(1, 1001)]
+        assert loadtest.percentile(values, 50) == 500
+        assert loadtest.percentile(values, 99) == 990
+        assert loadtest.percentile(values, 99.9) == 999
+        assert loadtest.percentile([], 99) == 0.0
+
+    def test_histogram_buckets(self):
+        """
+        Test: Cada latencia cae en el primer cubo cuyo límite no supera
+        """
+        buckets = loadtest.histogram([0.2, 0.5, 0.7, 3, 9000])
+        counts = {bucket['le_ms']: bucket['count'] for bucket in buckets}
+        assert counts[0.5] == 2
+        assert counts[1] == 1
+        assert counts[5] == 1
+        assert counts[None] == 1
+        assert sum(counts.values()) == 5
+
+    def test_schedule_keeps_fixed_rates(self):
+        """
+        Test: Cada tipo de petición llega a su ritmo y el plan está ordenado por tiempo
+        """
+        schedule = loadtest.arrival_schedule({'post': 3, 'write': 1}, rate=100, duration=10)
+        kinds = [kind for _, kind in schedule]
+        assert kinds.count('post') == 750
+        assert kinds.count('write') == 250
+        times = [t for t, _ in schedule]
+        assert times == sorted(times)
+        assert 0 <= times[0] and times[-1] < 10
+
+    def test_parse_mix_rejects_unknown_kind(self):
+        """
+        Test: La mezcla solo admite los tipos de petición conocidos
+        CASO EDGE: Nombre mal escrito
+        """
+        assert loadtest.parse_mix('index=1, search=2.5') == {'index': 1.0, 'search': 2.5}
+        with pytest.raises(ValueError):
+            loadtest.parse_mix('indx=1')
+
+    def test_run_against_live_server(self, app, tmp_path):
+        """
+        Test: Una prueba corta contra un servidor real produce el informe JSON
+        """
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        output = tmp_path / 'report.json'
+        try:
+            exit_code = loadtest.main([
+                '--url', f'http://127.0.0.1:{server.server_port}',
+                '--rate', '100', '--duration', '1', '--warmup', '0',
+                '--connections', '4', '--output', str(output)
+            ])
+        finally:
+            server.shutdown()
+
+        assert exit_code == 0
+        report = json.loads(output.read_text())
+        # El desfase aleatorio de cada flujo puede dejar una llegada fuera de la ventana
+        assert 100 - len(loadtest.DEFAULT_MIX) <= report['overall']['requests'] <= 100
+        assert report['overall']['errors'] == 0
+        assert set(report['endpoints']) == set(loadtest.DEFAULT_MIX)
+        assert {'p50', 'p99', 'p999'} <= set(report['overall']['latency_ms'])
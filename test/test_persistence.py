@@ -0,0 +1,233 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from app.models import BlogPost, BlogStorage
+from app.persistence import WriteBehindLog, read_log
+
+
+class TestWriteBehindPersistence:
+    """
+    Pruebas de la persistencia opcional en disco (log de cambios write-behind)
+
+    Usan un BlogStorage propio para no tocar el almacenamiento global
+    """
+
+    def test_state_survives_restart(self, tmp_path):
+        """
+        Test: Lo escrito en una instancia se recupera al arrancar otra con el mismo log
+        """
+        config = {'PERSIST_PATH': str(tmp_path / 'posts.log')}
+        storage = BlogStorage()
+        storage.configure(config)
+        post = storage.create_post(BlogPost('Persistido', 'Sobrevive al reinicio', 'Alice'))
+        storage.update_post(1, title='Bienvenida editada')
+        storage.delete_post(2)
+        storage.close()
+
+        restarted = BlogStorage()
+        restarted.configure(config)
+        try:
+            assert [p.id for p in restarted.get_all_posts()] == [post.id, 1]
+            assert restarted.get_post_by_id(1).title == 'Bienvenida editada'
+            assert restarted.get_post_by_id(1).version == 2
+            assert restarted.filter_posts(author='Alice')[0].content == 'Sobrevive al reinicio'
+            assert restarted.search_posts('reinicio')[0].id == post.id
+            # Los ids borrados no se reutilizan
+            assert restarted.create_post(BlogPost('Nuevo', 'Texto')).id == post.id + 1
+        finally:
+            restarted.close()
+
+    def test_imported_posts_survive_restart(self, tmp_path):
+        """
+        Test: La importación masiva también se guarda en el log
+        """
+        config = {'PERSIST_PATH': str(tmp_path / 'import.log')}
+        storage = BlogStorage()
+        storage.configure(config)
+        storage.create_post(BlogPost('Antes', 'Creado antes de importar'))
+        storage.import_posts([BlogPost(f'Importado {i}', 'Contenido importado') for i in range(3)])
+        storage.create_post(BlogPost('Después', 'Creado tras importar'))
+        storage.close()
+
+        restarted = BlogStorage()
+        restarted.configure(config)
+        try:
+            assert sorted(p.id for p in restarted.get_all_posts()) == [1, 2, 3, 4, 5, 6, 7]
+            assert len(restarted.search_posts('importado')) == 3
+            assert restarted.last_seq == storage.last_seq
+        finally:
+            restarted.close()
+
+    def test_group_commit_batches_writes(self, tmp_path):
+        """
+        Test: Los cambios que llegan juntos se escriben en un mismo grupo
+        """
+        path = str(tmp_path / 'batch.log')
+        log = WriteBehindLog(path, max_batch=100, max_delay=0.2)
+        writes = []
+        original_write = log._write
+        log._write = lambda records: (writes.append(len(records)), original_write(records))
+        for seq in range(50):
+            log.append({'seq': seq, 'op': 'delete', 'id': seq, 'data': None})
+        log.close()
+
+        assert sum(writes) == 50
+        assert len(writes) < 50  # Agrupados: menos fsync que cambios
+        assert [r['seq'] for r in read_log(path)] == list(range(50))
+
+    def test_full_queue_applies_backpressure(self, tmp_path):
+        """
+        Test: Con la cola llena, append() espera a que el escritor libere sitio
+        """
+        log = WriteBehindLog(str(tmp_path / 'slow.log'), max_batch=1, max_delay=0, queue_size=1)
+        writing = threading.Event()
+        release = threading.Event()
+        original_write = log._write
+        log._write = lambda records: (writing.set(), release.wait(), original_write(records))
+
+        log.append({'seq': 1})
+        # Hasta que el hilo no saca el primero la cola sigue llena: esperarlo
+        # evita que el segundo append() bloquee al propio test
+        assert writing.wait(timeout=1)
+        log.append({'seq': 2})  # Llena la cola
+        blocked = threading.Thread(target=log.append, args=({'seq': 3},))
+        blocked.start()
+        blocked.join(timeout=0.1)
+        assert blocked.is_alive()
+
+        release.set()
+        blocked.join(timeout=1)
+        assert not blocked.is_alive()
+        log.close()
+
+    def test_full_queue_does_not_block_reads(self, tmp_path):
+        """
+        Test: Mientras una escritura espera sitio en la cola, las lecturas no se bloquean
+        CASO EDGE: El cambio se encola fuera del lock y en orden de secuencia
+        """
+        path = str(tmp_path / 'reads.log')
+        storage = BlogStorage()
+        storage.configure({'PERSIST_PATH': path, 'PERSIST_MAX_BATCH': 1,
+                           'PERSIST_MAX_DELAY': 0, 'PERSIST_QUEUE_SIZE': 1})
+        storage.flush()
+        writing = threading.Event()
+        release = threading.Event()
+        original_write = storage._writer._write
+        storage._writer._write = lambda records: (writing.set(), release.wait(), original_write(records))
+
+        first_seq = storage.last_seq
+        writer = threading.Thread(target=lambda: [
+            storage.create_post(BlogPost(f'Post {i}', 'Contenido')) for i in range(3)
+        ])
+        writer.start()
+        try:
+            assert writing.wait(timeout=1)
+            # El tercer cambio ya está aplicado; su registro espera sitio en la cola
+            deadline = time.monotonic() + 1
+            while storage.last_seq < first_seq + 3:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            writer.join(timeout=0.1)
+            assert writer.is_alive()
+
+            reader = threading.Thread(target=lambda: (storage.get_all_posts(), storage.stats(),
+                                                      storage.search_posts('contenido')))
+            reader.start()
+            reader.join(timeout=1)
+            assert not reader.is_alive()
+        finally:
+            release.set()
+            writer.join(timeout=1)
+            storage.close()
+        seqs = [record['seq'] for record in read_log(path)]
+        assert seqs[-3:] == [first_seq + 1, first_seq + 2, first_seq + 3]
+
+    def test_truncated_last_line_is_ignored(self, tmp_path):
+        """
+        Test: Una línea a medio escribir (caída del proceso) no impide cargar el log
+        CASO EDGE: Log corrupto al final
+        """
+        path = tmp_path / 'crash.log'
+        record = {'seq': 1, 'op': 'delete', 'id': 1, 'data': None}
+        path.write_text(json.dumps(record) + '\n{"seq": 2, "op"')
+        assert list(read_log(str(path))) == [record]
+
+    def test_bad_line_in_the_middle_does_not_end_the_log(self, tmp_path):
+        """
+        Test: Una línea ilegible en medio del log se salta y se leen las siguientes
+        CASO EDGE: Log corrupto en medio
+        """
+        path = tmp_path / 'middle.log'
+        first = {'seq': 1, 'op': 'delete', 'id': 1, 'data': None}
+        last = {'seq': 3, 'op': 'delete', 'id': 3, 'data': None}
+        path.write_text(json.dumps(first) + '\n{"seq": 2, "op"\n' + json.dumps(last) + '\n')
+        assert list(read_log(str(path))) == [first, last]
+
+    def test_writes_after_crash_survive_next_restart(self, tmp_path):
+        """
+        Test: Tras una caída a mitad de línea, lo escrito después sigue recuperándose
+        CASO EDGE: El siguiente grupo no se pega al fragmento incompleto
+        """
+        path = tmp_path / 'crash.log'
+        config = {'PERSIST_PATH': str(path)}
+        storage = BlogStorage()
+        storage.configure(config)
+        storage.create_post(BlogPost('Antes', 'Escrito antes de la caída'))
+        storage.close()
+        with open(path, 'a', encoding='utf-8') as log:
+            log.write('{"seq": 99, "op": "cre')  # La caída corta la línea
+
+        after_crash = BlogStorage()
+        after_crash.configure(config)
+        post = after_crash.create_post(BlogPost('Después', 'Escrito tras la caída'))
+        after_crash.close()
+
+        restarted = BlogStorage()
+        restarted.configure(config)
+        try:
+            assert restarted.get_post_by_id(post.id).title == 'Después'
+            assert {'Antes', 'Después'} <= {p.title for p in restarted.get_all_posts()}
+            assert restarted.last_seq == after_crash.last_seq
+        finally:
+            restarted.close()
+
+    def test_app_script_starts_with_log_and_rebuild_pool(self, tmp_path):
+        """
+        Test: app.py arranca con log existente y REBUILD_WORKERS > 1
+        CASO EDGE: Los procesos del pool reimportan el script principal
+        """
+        path = tmp_path / 'app.log'
+        storage = BlogStorage()
+        storage.configure({'PERSIST_PATH': str(path)})
+        storage.create_post(BlogPost('Persistido', 'Cargado al arrancar app.py'))
+        storage.close()
+
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, FLASK_ENV='production', PORT=str(port), PERSIST_PATH=str(path),
+                   REBUILD_WORKERS='2', PARALLEL_REBUILD_MIN_POSTS='0',
+                   JINJA_BYTECODE_CACHE_DIR=str(tmp_path / 'jinja'))
+        server = subprocess.Popen([sys.executable, 'app.py'], cwd=root, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + 20
+            while True:
+                assert server.poll() is None, 'app.py terminó al arrancar'
+                try:
+                    with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/posts', timeout=1) as response:
+                        posts = json.load(response)
+                    break
+                except OSError:
+                    assert time.monotonic() < deadline, 'app.py no respondió a tiempo'
+                    time.sleep(0.1)
+            assert 'Persistido' in json.dumps(posts)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
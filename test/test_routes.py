@@ -149,3 +149,66 @@ class TestWebRoutes:
         # Probar que los links funcionan
         response = client.get('/create')
         assert response.status_code == 200
+
+    def test_index_filter_by_author(self, client):
+        """
+        Test: La página principal acepta ?author= y muestra solo sus posts
+        """
+        client.post('/create', data={
+            'title': 'Post de Alice',
+            'content': 'Contenido de prueba',
+            'author': 'Alice'
+        })
+        response = client.get('/?author=Alice')
+        assert response.status_code == 200
+        assert b'Post de Alice' in response.data
+        assert b'Mi experiencia con Docker' not in response.data
+
+    def test_search_fuzzy_offer_and_results(self, client):
+        """
+        Test: Sin resultados se ofrece la búsqueda tolerante, y esta encuentra el post
+        """
+        response = client.get('/search?q=dokcer')
+        assert b'Buscar tolerando errores' in response.data
+
+        response = client.get('/search?q=dokcer&fuzzy=1')
+        assert b'Mi experiencia con Docker' in response.data
+
+    def test_view_post_renders_paragraphs_and_stats(self, client):
+        """
+        Test: El post se muestra en párrafos con estadísticas precalculadas
+        y el HTML del contenido se escapa
+        """
+        client.post('/create', data={
+            'title': 'Párrafos',
+            'content': 'uno dos\ntres\n\n<script>alert(1)</script>',
+            'author': 'Test Author'
+        })
+        response = client.get('/post/3')
+        assert b'<p>uno dos<br>tres</p>' in response.data
+        assert b'<script>alert(1)</script>' not in response.data
+        assert b'&lt;script&gt;' in response.data
+        assert b'<strong>Palabras aprox:</strong> 4' in response.data
+
+    def test_sidebar_stats_ignore_filters(self, client):
+        """
+        Test: La barra lateral muestra el total del blog aunque la lista esté filtrada
+        """
+        client.post('/create', data={
+            'title': 'Otro autor', 'content': 'Contenido', 'author': 'Ana'
+        })
+        response = client.get('/?author=Ana')
+        assert b'<strong>3</strong> posts' in response.data
+        assert b'<strong>2</strong> autores' in response.data
+
+    def test_static_assets_are_served(self, client):
+        """
+        Test: Los archivos de static/ que enlaza la plantilla base se sirven
+        """
+        response = client.get('/static/script.js')
+        assert response.status_code == 200
+        assert 'javascript' in response.content_type
+        response.close()
+        response = client.get('/static/style.css')
+        assert response.status_code == 200
+        response.close()